@@ -0,0 +1,115 @@
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models.signals import post_save
+from rest_framework import serializers, status
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+def max_batch_size():
+    return getattr(settings, 'API_BULK_MAX_ITEMS', 500)
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """Проверяет элементы по отдельности и сохраняет корректные разом.
+
+    Ошибки элементов не прерывают проверку: они собираются в item_errors
+    в порядке входных данных, а validated_data содержит только
+    корректные элементы.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Ожидается список объектов.']
+            })
+        if len(data) > max_batch_size():
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    f'Не больше {max_batch_size()} объектов за запрос.']
+            })
+        self.item_errors = []
+        validated = []
+        for item in data:
+            try:
+                validated.append(self.child.run_validation(item))
+            except serializers.ValidationError as exc:
+                self.item_errors.append(exc.detail)
+            else:
+                self.item_errors.append(None)
+        return validated
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        prepare = getattr(self.child, 'prepare', None)
+        if prepare is not None:
+            validated_data = [prepare(attrs) for attrs in validated_data]
+        objs = [model(**attrs) for attrs in validated_data]
+        if not objs:
+            return objs
+        connection = connections[router.db_for_write(model)]
+        with transaction.atomic(using=connection.alias):
+            if self._bulk_ids(connection):
+                model.objects.using(connection.alias).bulk_create(objs)
+                self._assign_ids(connection, model, objs, validated_data[0])
+                for obj in objs:
+                    post_save.send(
+                        sender=model, instance=obj, created=True,
+                        update_fields=None, raw=False, using=obj._state.db)
+            else:
+                # Без RETURNING и без блокировки всей базы id надёжно
+                # получаются только при построчной вставке.
+                for obj in objs:
+                    obj.save(force_insert=True, using=connection.alias)
+        return objs
+
+    @staticmethod
+    def _bulk_ids(connection):
+        return (connection.features.can_return_ids_from_bulk_insert
+                or connection.vendor == 'sqlite')
+
+    @staticmethod
+    def _assign_ids(connection, model, objs, attrs):
+        if objs[0].pk is not None:
+            return
+        # SQLite не возвращает id из bulk_create, но держит блокировку
+        # записи до конца транзакции: последние len(objs) строк этого
+        # автора и есть наши. Другие бэкенды без RETURNING сюда не
+        # попадают, у них вставка построчная.
+        assert connection.vendor == 'sqlite'
+        owner = {
+            name: value for name, value in attrs.items()
+            if name in ('author', 'post')
+        }
+        ids = model.objects.using(connection.alias).filter(**owner).order_by(
+            '-pk').values_list('pk', flat=True)[:len(objs)]
+        for obj, pk in zip(objs, reversed(list(ids))):
+            obj.pk = pk
+            obj._state.adding = False
+            obj._state.db = connection.alias
+
+
+class BulkCreateMixin:
+    def bulk_create(self, request, **save_kwargs):
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        created = iter(serializer.save(**save_kwargs))
+        results = []
+        for errors in serializer.item_errors:
+            if errors is None:
+                data = serializer.child.to_representation(next(created))
+                results.append(
+                    {'status': status.HTTP_201_CREATED, 'data': data})
+            else:
+                results.append(
+                    {'status': status.HTTP_400_BAD_REQUEST,
+                     'errors': errors})
+        failed = sum(errors is not None for errors in serializer.item_errors)
+        if not failed:
+            code = status.HTTP_201_CREATED
+        elif failed == len(results):
+            code = status.HTTP_400_BAD_REQUEST
+        else:
+            code = status.HTTP_207_MULTI_STATUS
+        return Response({'results': results}, status=code)
@@ -0,0 +1,15 @@
+from rest_framework.filters import BaseFilterBackend
+
+from posts.search import search
+
+
+class PostSearchFilter(BaseFilterBackend):
+    """Ограничивает записи найденными в поисковом индексе по ?search=."""
+
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return queryset.filter(pk__in=search(query))
@@ -0,0 +1,86 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from api.projections import ValuesProjection
+from api.serializers import CommentSerializer, PostSerializer
+from posts.models import Comment, Group, Post, User
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает скорость ModelSerializer и values()-сериализации '
+            'записей и комментариев API.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def fill(self, rows):
+        author = User.objects.create(username='bench-serializers')
+        group = Group.objects.create(
+            title='bench-serializers', slug='bench-serializers',
+            description='bench')
+        Post.objects.bulk_create(
+            [Post(text=f'Запись {number}', author=author,
+                  group=group if number % 2 else None,
+                  image='posts/bench.jpg' if number % 3 else None)
+             for number in range(rows)],
+            batch_size=500)
+        post = Post.objects.filter(author=author).first()
+        Comment.objects.bulk_create(
+            [Comment(text=f'Комментарий {number}', author=author, post=post)
+             for number in range(rows)],
+            batch_size=500)
+        return author
+
+    def measure(self, name, serialize, rows, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            content = JSONRenderer().render(serialize())
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        self.stdout.write(
+            f'{name:<28} {rows / best:>12.0f} rows/sec')
+        return content
+
+    def compare(self, label, serializer_class, queryset, context, options):
+        rows = queryset.count()
+        slow = self.measure(
+            f'{label} ModelSerializer',
+            lambda: serializer_class(
+                queryset.all(), many=True, context=context).data,
+            rows, options['repeat'])
+        projection = ValuesProjection(serializer_class, context)
+        fast = self.measure(
+            f'{label} values()',
+            lambda: projection.rows(projection.values(queryset.all())),
+            rows, options['repeat'])
+        if slow != fast:
+            raise CommandError(f'{label}: JSON двух путей не совпадает.')
+
+    def handle(self, *args, **options):
+        request = APIRequestFactory().get('/api/v1/posts/')
+        context = {'request': request}
+        try:
+            with transaction.atomic():
+                author = self.fill(options['rows'])
+                self.compare(
+                    'posts', PostSerializer,
+                    Post.objects.feed().filter(author=author),
+                    context, options)
+                self.compare(
+                    'comments', CommentSerializer,
+                    Comment.objects.select_related('author').filter(
+                        author=author),
+                    context, options)
+                raise Rollback
+        except Rollback:
+            pass
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .projections import ValuesProjection
+
+
+class StreamingListMixin:
+    stream_query_param = 'stream'
+
+    def wants_stream(self, request):
+        value = request.query_params.get(self.stream_query_param, '')
+        return value.lower() in ('1', 'true', 'yes')
+
+    def serialize_rows(self, queryset, chunk_size):
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        for obj in queryset.iterator(chunk_size):
+            yield serializer_class(obj, context=context).data
+
+    def stream_rows(self, queryset):
+        renderer = JSONRenderer()
+        chunk_size = getattr(settings, 'API_STREAM_CHUNK_SIZE', 500)
+        yield b'['
+        for number, data in enumerate(
+                self.serialize_rows(queryset, chunk_size)):
+            if number:
+                yield b','
+            yield renderer.render(data)
+        yield b']'
+
+    def list(self, request, *args, **kwargs):
+        if not self.wants_stream(request):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            self.stream_rows(queryset), content_type='application/json')
+
+
+class ValuesListMixin(StreamingListMixin):
+    def get_projection(self):
+        return ValuesProjection(
+            self.get_serializer_class(), self.get_serializer_context())
+
+    def serialize_rows(self, queryset, chunk_size):
+        projection = self.get_projection()
+        for values in projection.values(queryset).iterator(chunk_size):
+            yield projection.row(values)
+
+    def list(self, request, *args, **kwargs):
+        if self.wants_stream(request):
+            return super().list(request, *args, **kwargs)
+        projection = self.get_projection()
+        queryset = projection.values(
+            self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(projection.rows(page))
+        return Response(projection.rows(queryset))
@@ -0,0 +1,54 @@
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from posts.pagination import CursorPaginator
+
+
+class KeysetPagination(BasePagination):
+    after_query_param = 'after'
+    before_query_param = 'before'
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return getattr(settings, 'API_PAGE_SIZE', 20)
+        return min(max(size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        field = getattr(view, 'cursor_field', 'pub_date')
+        paginator = CursorPaginator(
+            queryset, self.get_page_size(request), field)
+        self.page = paginator.get_page(
+            after=request.query_params.get(self.after_query_param),
+            before=request.query_params.get(self.before_query_param))
+        return list(self.page)
+
+    def _link(self, param, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        for name in (self.after_query_param, self.before_query_param):
+            url = remove_query_param(url, name)
+        return replace_query_param(url, param, cursor)
+
+    def get_next_link(self):
+        return self._link(self.after_query_param, self.page.next_cursor())
+
+    def get_previous_link(self):
+        return self._link(
+            self.before_query_param, self.page.previous_cursor())
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
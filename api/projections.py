@@ -0,0 +1,60 @@
+from rest_framework import fields, relations
+
+
+def _file_url(field, request):
+    storage = field.parent.Meta.model._meta.get_field(field.source).storage
+
+    def convert(name):
+        if not name:
+            return None
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request else url
+    return convert
+
+
+class ValuesProjection:
+    """Сериализация строк .values() в словари без ModelSerializer.
+
+    Порядок ключей и представление значений совпадают с выдачей
+    serializer_class, поэтому JSON получается тем же байт в байт.
+    """
+
+    def __init__(self, serializer_class, context):
+        request = context.get('request')
+        self.names = []
+        self.columns = []
+        self.converters = []
+        for name, field in serializer_class(context=context).fields.items():
+            if field.write_only:
+                continue
+            self.names.append(name)
+            self.columns.append(field.source.replace('.', '__'))
+            self.converters.append(self._converter(field, request))
+
+    @staticmethod
+    def _converter(field, request):
+        if isinstance(field, fields.FileField):
+            return _file_url(field, request)
+        if isinstance(field, (fields.DateTimeField, fields.DateField)):
+            return field.to_representation
+        if isinstance(field, (fields.ReadOnlyField, fields.CharField,
+                              fields.IntegerField, fields.BooleanField,
+                              relations.PrimaryKeyRelatedField)):
+            return None
+        raise TypeError(f'Поле {field!r} нельзя получить через values().')
+
+    def values(self, queryset):
+        return queryset.values(*self.columns)
+
+    def row(self, values):
+        return {
+            name: (
+                value if value is None or convert is None
+                else convert(value))
+            for name, convert, value in zip(
+                self.names, self.converters,
+                (values[column] for column in self.columns))
+        }
+
+    def rows(self, values_list):
+        return [self.row(values) for values in values_list]
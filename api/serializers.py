@@ -1,17 +1,40 @@
+from django.core.files.uploadedfile import UploadedFile
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
+from posts import images
+from posts.forms import IngestImageField
 from posts.models import Comment, Follow, Group, Post, User
+from .bulk import BulkListSerializer
+
+
+class PostImageField(serializers.ImageField):
+    _DjangoImageField = IngestImageField
 
 
 class PostSerializer(serializers.ModelSerializer):
     author = serializers.ReadOnlyField(
         source='author.username'
     )
+    image = PostImageField(required=False, allow_null=True)
 
     class Meta:
         fields = ('__all__')
         model = Post
+        list_serializer_class = BulkListSerializer
+
+    def prepare(self, attrs):
+        """Сохраняет загруженную картинку, когда запись уже проверена."""
+        image = attrs.get('image')
+        if isinstance(image, UploadedFile):
+            attrs['image'] = images.ingest(image)
+        return attrs
+
+    def create(self, validated_data):
+        return super().create(self.prepare(validated_data))
+
+    def update(self, instance, validated_data):
+        return super().update(instance, self.prepare(validated_data))
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -22,6 +45,7 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         fields = ('__all__')
         model = Comment
+        list_serializer_class = BulkListSerializer
 
 
 class FollowSerializer(serializers.ModelSerializer):
@@ -0,0 +1,385 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+
+from api.serializers import CommentSerializer, PostSerializer
+from posts import changes, images
+from posts.tests.test_forms import make_upload
+from posts.models import (
+    Change, Comment, Follow, Group, Post, Profile, User)
+
+AUTHOR_USERNAME = 'ApiTestUser'
+FOLLOWER_USERNAME = 'ApiFollowUser'
+
+GROUP_TITLE = 'Тестовая группа'
+GROUP_DESCRIPTION = 'Тестовое описание'
+GROUP_SLUG = 'test-group'
+
+POST_TEXT = 'Тестовый текст'
+
+POSTS_URL = '/api/v1/posts/'
+GROUPS_URL = '/api/v1/group/'
+CHANGES_URL = '/api/v1/changes/'
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(API_PAGE_SIZE=5)
+class ApiPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create(username=AUTHOR_USERNAME)
+
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE,
+            slug=GROUP_SLUG,
+            description=GROUP_DESCRIPTION
+        )
+
+        Post.objects.bulk_create([
+            Post(text=f'{POST_TEXT} {number}', author=cls.author,
+                 group=cls.group)
+            for number in range(12)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def collect(self, url):
+        results = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            results.extend(response.data['results'])
+            url = response.data['next']
+        return results
+
+    def test_posts_pages(self):
+        """Проверка курсорной пагинации списка записей."""
+        response = self.client.get(POSTS_URL)
+        self.assertEqual(
+            len(response.data['results']), 5,
+            'Количество записей на странице API не совпадает с ожидаемым.')
+        self.assertIsNone(
+            response.data['previous'],
+            'У первой страницы не должно быть предыдущей.')
+        ids = [post['id'] for post in self.collect(POSTS_URL)]
+        self.assertEqual(
+            ids,
+            list(Post.objects.order_by('-pub_date', '-pk').values_list(
+                'pk', flat=True)),
+            'Страницы API должны покрывать все записи по порядку.')
+
+    def test_groups_pages(self):
+        """Проверка курсорной пагинации списка групп."""
+        self.assertEqual(
+            len(self.collect(GROUPS_URL)), 1,
+            'Проверьте пагинацию списка групп.')
+
+    def test_posts_search(self):
+        """Проверка фильтра ?search= по поисковому индексу."""
+        call_command('rebuild_search', stdout=StringIO())
+        response = self.client.get(POSTS_URL, {'search': 'текст 3'})
+        self.assertEqual(
+            [post['text'] for post in response.data['results']],
+            [f'{POST_TEXT} 3'],
+            'Проверьте поиск по записям в API.')
+
+    def test_posts_stream(self):
+        """Проверка потоковой выдачи списка записей."""
+        response = self.client.get(POSTS_URL, {'stream': '1'})
+        self.assertTrue(
+            response.streaming,
+            'Ответ с stream=1 должен быть потоковым.')
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(
+            len(data), Post.objects.count(),
+            'Потоковая выдача должна содержать все записи.')
+        self.assertEqual(
+            data[0], self.client.get(POSTS_URL).data['results'][0],
+            'Потоковая выдача должна совпадать с обычной.')
+
+
+class ValuesListTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create(username=AUTHOR_USERNAME)
+
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE,
+            slug=GROUP_SLUG,
+            description=GROUP_DESCRIPTION
+        )
+
+        cls.post = Post.objects.create(
+            text=POST_TEXT,
+            author=cls.author,
+            group=cls.group,
+            image='posts/small.gif',
+        )
+        Post.objects.create(text=POST_TEXT, author=cls.author)
+        Comment.objects.create(
+            post=cls.post, author=cls.author, text=POST_TEXT)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def model_serializer_json(self, url, serializer_class, queryset):
+        request = APIRequestFactory().get(url)
+        data = serializer_class(
+            queryset, many=True, context={'request': request}).data
+        return JSONRenderer().render(
+            {'next': None, 'previous': None, 'results': data})
+
+    def test_posts_list_matches_model_serializer(self):
+        """Проверка совпадения быстрой выдачи записей с ModelSerializer."""
+        self.assertEqual(
+            self.client.get(POSTS_URL).content,
+            self.model_serializer_json(
+                POSTS_URL, PostSerializer,
+                Post.objects.order_by('-pub_date', '-pk')),
+            'Выдача values() должна совпадать с ModelSerializer.')
+
+    def test_comments_list_matches_model_serializer(self):
+        """Проверка совпадения быстрой выдачи комментариев."""
+        url = f'{POSTS_URL}{ValuesListTests.post.pk}/comments/'
+        self.assertEqual(
+            self.client.get(url).content,
+            self.model_serializer_json(
+                url, CommentSerializer, Comment.objects.all()),
+            'Выдача values() должна совпадать с ModelSerializer.')
+
+    def test_bench_serializers(self):
+        """Проверка команды bench_serializers."""
+        out = StringIO()
+        call_command(
+            'bench_serializers', rows=10, repeat=1, stdout=out)
+        self.assertIn('rows/sec', out.getvalue())
+        self.assertFalse(
+            Post.objects.filter(author__username='bench-serializers').exists(),
+            'Бенчмарк не должен оставлять данные.')
+
+
+@override_settings(API_BULK_MAX_ITEMS=3)
+class BulkCreateTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create(username=AUTHOR_USERNAME)
+
+        cls.post = Post.objects.create(text=POST_TEXT, author=cls.author)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(BulkCreateTests.author)
+
+    def test_bulk_posts(self):
+        """Проверка пакетного создания записей."""
+        response = self.client.post(
+            f'{POSTS_URL}bulk/',
+            [{'text': POST_TEXT}, {'group': 100}, {'text': POST_TEXT}],
+            format='json')
+        self.assertEqual(response.status_code, 207)
+        statuses = [item['status'] for item in response.data['results']]
+        self.assertEqual(
+            statuses, [201, 400, 201],
+            'Проверьте результаты пакетного создания записей.')
+        for item in (response.data['results'][0],
+                     response.data['results'][2]):
+            self.assertTrue(
+                Post.objects.filter(
+                    pk=item['data']['id'], author=BulkCreateTests.author,
+                    text=POST_TEXT).exists(),
+                'Проверьте id созданных записей.')
+        self.assertEqual(
+            Profile.objects.get(user=BulkCreateTests.author).posts_count,
+            3,
+            'Пакетное создание должно обновлять счётчики.')
+
+    def test_bulk_posts_without_returning(self):
+        """Проверка построчной вставки на бэкендах без RETURNING."""
+        with mock.patch.object(connection, 'vendor', 'mysql'):
+            response = self.client.post(
+                f'{POSTS_URL}bulk/', [{'text': POST_TEXT}] * 2,
+                format='json')
+        self.assertEqual(response.status_code, 201)
+        ids = [item['data']['id'] for item in response.data['results']]
+        self.assertEqual(
+            ids, list(Post.objects.filter(
+                author=BulkCreateTests.author).exclude(
+                    pk=BulkCreateTests.post.pk).order_by('pk')
+                .values_list('pk', flat=True)),
+            'Проверьте id созданных записей.')
+        self.assertEqual(
+            Profile.objects.get(user=BulkCreateTests.author).posts_count,
+            3,
+            'Сигналы должны отправляться по одному разу на запись.')
+
+    def test_bulk_comments(self):
+        """Проверка пакетного создания комментариев."""
+        response = self.client.post(
+            f'{POSTS_URL}{BulkCreateTests.post.pk}/comments/bulk/',
+            [{'text': POST_TEXT, 'post': BulkCreateTests.post.pk}] * 2,
+            format='json')
+        self.assertEqual(response.status_code, 201)
+        self.post.refresh_from_db()
+        self.assertEqual(
+            self.post.comments.count(), 2,
+            'Проверьте пакетное создание комментариев.')
+        self.assertEqual(
+            self.post.comments_count, 2,
+            'Пакетное создание должно обновлять счётчики.')
+
+    def test_bulk_limit(self):
+        """Проверка ограничения размера пакета."""
+        response = self.client.post(
+            f'{POSTS_URL}bulk/', [{'text': POST_TEXT}] * 4, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(
+            Post.objects.exclude(pk=BulkCreateTests.post.pk).exists(),
+            'Слишком большой пакет не должен сохраняться.')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImageUploadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create(username=AUTHOR_USERNAME)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(ImageUploadTests.author)
+
+    def test_image_stored_after_validation(self):
+        """Проверка сохранения картинки только у принятой записи."""
+        upload = make_upload()
+        name = images.content_name(upload, 'jpg')
+        response = self.client.post(
+            POSTS_URL, {'text': POST_TEXT, 'group': 100, 'image': upload},
+            format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(
+            default_storage.exists(name),
+            'Отклонённая запись не должна сохранять картинку.')
+        response = self.client.post(
+            POSTS_URL, {'text': POST_TEXT, 'image': make_upload()},
+            format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(
+            Post.objects.filter(pk=response.data['id'], image=name).exists(),
+            'Проверьте сохранение картинки в API.')
+
+
+class ChangesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create(username=AUTHOR_USERNAME)
+        cls.follower = User.objects.create(username=FOLLOWER_USERNAME)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(ChangesTests.follower)
+        self.watermark = self.client.get(CHANGES_URL).data['watermark']
+
+    def test_changes_since_watermark(self):
+        """Проверка выдачи изменений с отметки."""
+        post = Post.objects.create(text=POST_TEXT, author=ChangesTests.author)
+        deleted = Post.objects.create(
+            text=POST_TEXT, author=ChangesTests.author)
+        deleted_id = deleted.pk
+        deleted.delete()
+        Follow.objects.create(
+            user=ChangesTests.follower, author=ChangesTests.author)
+        Follow.objects.create(
+            user=ChangesTests.author, author=ChangesTests.follower)
+        response = self.client.get(CHANGES_URL, {'since': self.watermark})
+        self.assertEqual(
+            [item['id'] for item in response.data['posts']['updated']],
+            [post.pk],
+            'Проверьте изменённые записи в журнале.')
+        self.assertEqual(
+            response.data['posts']['deleted'], [deleted_id],
+            'Проверьте удалённые записи в журнале.')
+        self.assertEqual(
+            [item['author'] for item in response.data['follows']['updated']],
+            [AUTHOR_USERNAME],
+            'Пользователь должен видеть только свои подписки.')
+        response = self.client.get(
+            CHANGES_URL, {'since': response.data['watermark']})
+        self.assertEqual(
+            response.data['posts'], {'updated': [], 'deleted': []},
+            'После новой отметки изменений быть не должно.')
+
+    def test_changes_limit(self):
+        """Проверка ограничения размера выдачи журнала."""
+        for _ in range(3):
+            Post.objects.create(text=POST_TEXT, author=ChangesTests.author)
+        response = self.client.get(
+            CHANGES_URL, {'since': self.watermark, 'limit': 2})
+        self.assertTrue(response.data['has_more'])
+        response = self.client.get(
+            CHANGES_URL, {'since': response.data['watermark']})
+        self.assertEqual(len(response.data['posts']['updated']), 1)
+        self.assertFalse(response.data['has_more'])
+
+    def test_comment_counter_logged(self):
+        """Проверка записи в журнал изменения счётчика комментариев."""
+        post = Post.objects.create(text=POST_TEXT, author=ChangesTests.author)
+        response = self.client.get(CHANGES_URL, {'since': self.watermark})
+        Comment.objects.create(
+            post=post, author=ChangesTests.follower, text=POST_TEXT)
+        response = self.client.get(
+            CHANGES_URL, {'since': response.data['watermark']})
+        self.assertEqual(
+            [item['comments_count']
+             for item in response.data['posts']['updated']], [1],
+            'Изменение счётчика комментариев должно попадать в журнал.')
+
+    @override_settings(API_SYNC_RETENTION=0)
+    def test_expired_watermark(self):
+        """Проверка отметок после очистки журнала."""
+        for _ in range(3):
+            Post.objects.create(text=POST_TEXT, author=ChangesTests.author)
+        fresh = self.client.get(CHANGES_URL).data['watermark']
+        changes.prune()
+        self.assertEqual(
+            Change.objects.count(), 1,
+            'Очистка должна оставлять только последнее изменение.')
+        response = self.client.get(CHANGES_URL, {'since': self.watermark})
+        self.assertEqual(
+            response.status_code, 410,
+            'Отметка до очищенной части журнала должна устаревать.')
+        for _ in range(2):
+            response = self.client.get(CHANGES_URL, {'since': fresh})
+            self.assertEqual(
+                response.status_code, 200,
+                'Свежая отметка не должна устаревать без новых изменений.')
+            fresh = response.data['watermark']
+
+    def test_broken_watermark(self):
+        """Проверка некорректной отметки."""
+        response = self.client.get(CHANGES_URL, {'since': 'broken'})
+        self.assertEqual(response.status_code, 400)
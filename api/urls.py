@@ -3,7 +3,8 @@ from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import (TokenObtainPairView,
                                             TokenRefreshView)
 
-from .views import CommentsViewSet, FollowViewSet, GroupViewSet, PostsViewSet
+from .views import (ChangesView, CommentsViewSet, FollowViewSet, GroupViewSet,
+                    PostsViewSet)
 
 router_v1 = DefaultRouter()
 router_v1.register(
@@ -16,6 +17,7 @@ router_v1.register(
     r'group', GroupViewSet, basename='group')
 
 urlpatterns = [
+    path('v1/changes/', ChangesView.as_view(), name='changes'),
     path('v1/', include(router_v1.urls)),
     path('v1/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('v1/token/refresh/', TokenRefreshView.as_view(), name='token_refresh')
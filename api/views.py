@@ -1,34 +1,55 @@
+from django.conf import settings
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, viewsets
+from rest_framework import filters, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import (IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from posts.models import Follow, Group, Post, User
+from posts import changes
+from posts.models import Change, Comment, Follow, Group, Post, User
+from posts.pagination import decode_cursor, encode_cursor
+from .bulk import BulkCreateMixin
+from .filters import PostSearchFilter
+from .mixins import StreamingListMixin, ValuesListMixin
+from .pagination import KeysetPagination
 from .permissions import IsAuthorOrReadOnly
+from .projections import ValuesProjection
 from .serializers import (
     CommentSerializer, FollowSerializer, GroupSerializer, PostSerializer)
 
 
-class PostsViewSet(viewsets.ModelViewSet):
-    queryset = Post.objects.all()
+class PostsViewSet(BulkCreateMixin, ValuesListMixin, viewsets.ModelViewSet):
+    queryset = Post.objects.feed()
     serializer_class = PostSerializer
     permission_classes = [IsAuthorOrReadOnly, IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, PostSearchFilter]
     filterset_fields = ['group']
+    pagination_class = KeysetPagination
+    cursor_field = 'pub_date'
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        return self.bulk_create(request, author=request.user)
 
-class CommentsViewSet(viewsets.ModelViewSet):
+
+class CommentsViewSet(BulkCreateMixin, ValuesListMixin,
+                      viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [IsAuthorOrReadOnly, IsAuthenticatedOrReadOnly]
+    pagination_class = KeysetPagination
+    cursor_field = 'created'
 
     def get_queryset(self):
         post_id = self.kwargs.get('post_id')
         post = get_object_or_404(Post, id=post_id)
-        queryset = post.comments.all()
+        queryset = post.comments.select_related('author')
         return queryset
 
     def perform_create(self, serializer):
@@ -40,6 +61,11 @@ class CommentsViewSet(viewsets.ModelViewSet):
         }
         serializer.save(**data)
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request, post_id=None):
+        post = get_object_or_404(Post, id=post_id)
+        return self.bulk_create(request, author=request.user, post=post)
+
 
 class FollowViewSet(viewsets.ModelViewSet):
     serializer_class = FollowSerializer
@@ -57,8 +83,78 @@ class FollowViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
-class GroupViewSet(viewsets.ModelViewSet):
+class GroupViewSet(StreamingListMixin, viewsets.ModelViewSet):
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     http_method_names = ['get', 'post']
+    pagination_class = KeysetPagination
+    cursor_field = None
+
+
+class ChangesView(APIView):
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    sections = {
+        'post': 'posts',
+        'comment': 'comments',
+        'follow': 'follows',
+        'group': 'groups',
+    }
+
+    def get_limit(self, request):
+        limit = getattr(settings, 'API_SYNC_LIMIT', 500)
+        try:
+            return min(max(int(request.query_params['limit']), 1), limit)
+        except (KeyError, ValueError):
+            return limit
+
+    def serialize(self, model, ids):
+        context = {'request': self.request}
+        if model == 'post':
+            projection = ValuesProjection(PostSerializer, context)
+            return projection.rows(
+                projection.values(Post.objects.filter(pk__in=ids)))
+        if model == 'comment':
+            projection = ValuesProjection(CommentSerializer, context)
+            return projection.rows(
+                projection.values(Comment.objects.filter(pk__in=ids)))
+        if model == 'follow':
+            follows = Follow.objects.filter(
+                pk__in=ids, user=self.request.user
+            ).select_related('user', 'author')
+            return FollowSerializer(follows, many=True, context=context).data
+        return GroupSerializer(
+            Group.objects.filter(pk__in=ids), many=True,
+            context=context).data
+
+    def get(self, request):
+        token = request.query_params.get('since')
+        data = {section: {'updated': [], 'deleted': []}
+                for section in self.sections.values()}
+        if not token:
+            data.update(
+                watermark=encode_cursor(None, changes.latest_watermark()),
+                has_more=False)
+            return Response(data)
+        cursor = decode_cursor(token)
+        if cursor is None:
+            raise ValidationError({'since': 'Некорректная отметка.'})
+        if changes.expired(cursor[1]):
+            return Response(
+                {'detail': 'Отметка устарела, выполните полную '
+                           'синхронизацию.'},
+                status=status.HTTP_410_GONE)
+        latest, last, has_more = changes.since(
+            cursor[1], request.user, self.get_limit(request))
+        updated = {model: [] for model in self.sections}
+        for (model, object_id), action_name in latest.items():
+            if action_name == Change.DELETED:
+                data[self.sections[model]]['deleted'].append(object_id)
+            else:
+                updated[model].append(object_id)
+        for model, ids in updated.items():
+            if ids:
+                data[self.sections[model]]['updated'] = self.serialize(
+                    model, ids)
+        data.update(watermark=encode_cursor(None, last), has_more=has_more)
+        return Response(data)
@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.utils.html import format_html
 
-from .models import Comment, Group, Post, Follow
+from .models import Comment, Follow, Group, Post, Profile
+from .search import search
 
 
 class CommentInLine(admin.StackedInline):
@@ -17,6 +18,11 @@ class PostAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
     inlines = [CommentInLine]
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.filter(pk__in=search(search_term)), False
+
     def image_tag(self, post):
         if post.image:
             return format_html(
@@ -37,3 +43,10 @@ class GroupAdmin(admin.ModelAdmin):
 @admin.register(Follow)
 class FollowAdmin(admin.ModelAdmin):
     list_display = ('user', 'author',)
+
+
+@admin.register(Profile)
+class ProfileAdmin(admin.ModelAdmin):
+    list_display = (
+        'user', 'posts_count', 'followers_count', 'following_count',)
+    search_fields = ('user__username',)
@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from tasks.registry import task
+from .models import Change, Comment, Follow, Group, Post
+
+PRUNE_EVERY = 1000
+
+TRACKED = {
+    Post: 'post',
+    Comment: 'comment',
+    Follow: 'follow',
+    Group: 'group',
+}
+
+
+def retention():
+    return getattr(settings, 'API_SYNC_RETENTION', 30 * 24 * 60 * 60)
+
+
+def log(model, object_id, action, owner=None):
+    change = Change.objects.create(
+        model=model, object_id=object_id, action=action, owner=owner)
+    # Отдельного планировщика нет: очистку ставит в очередь каждая
+    # PRUNE_EVERY-я запись журнала.
+    if change.pk % PRUNE_EVERY == 0:
+        prune.delay()
+
+
+def record(instance, action):
+    owner = instance.user_id if isinstance(instance, Follow) else None
+    log(TRACKED[type(instance)], instance.pk, action, owner)
+
+
+def touch(model, object_id):
+    """Отмечает изменение объекта, обновлённого через update()."""
+    log(TRACKED[model], object_id, Change.UPDATED)
+
+
+def expired(watermark):
+    """Журнал после отметки мог быть очищен: клиенту нужна полная
+    синхронизация.
+
+    prune удаляет только старые строки и всегда оставляет последнюю,
+    поэтому всё, что младше самой старой оставшейся строки, удалено.
+    """
+    oldest = Change.objects.order_by('pk').values_list(
+        'pk', flat=True).first()
+    return oldest is not None and watermark < oldest - 1
+
+
+@task(name='posts.prune_changes', unique=True)
+def prune():
+    cutoff = timezone.now() - timedelta(seconds=retention())
+    return Change.objects.filter(
+        created__lt=cutoff, pk__lt=latest_watermark()).delete()[0]
+
+
+def since(watermark, user, limit):
+    visible = Q(owner__isnull=True)
+    if user.is_authenticated:
+        visible |= Q(owner=user.pk)
+    rows = list(
+        Change.objects.filter(visible, pk__gt=watermark).order_by('pk')
+        .values_list('pk', 'model', 'object_id', 'action')[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    latest = {}
+    for _, model, object_id, action in rows:
+        latest[(model, object_id)] = action
+    last = rows[-1][0] if rows else watermark
+    return latest, last, has_more
+
+
+def latest_watermark():
+    return Change.objects.order_by('-pk').values_list(
+        'pk', flat=True).first() or 0
@@ -0,0 +1,64 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from . import changes
+from .models import Comment, Follow, Post, Profile, User
+
+
+def _bump(queryset, field, delta):
+    # Разошедшийся счётчик не уходит ниже нуля, а исправляется recount:
+    # иначе CHECK на PositiveIntegerField ломает само удаление.
+    value = F(field) + delta
+    if delta < 0:
+        value = Greatest(value, 0)
+    return queryset.update(**{field: value})
+
+
+def bump_comments(post_id, delta):
+    # comments_count отдаётся в API, поэтому клиенты синхронизации
+    # должны перечитать запись.
+    if _bump(Post.objects.filter(pk=post_id), 'comments_count', delta):
+        changes.touch(Post, post_id)
+
+
+def bump_profile(user_id, field, delta):
+    if user_id is not None:
+        _bump(Profile.objects.filter(user_id=user_id), field, delta)
+
+
+def _count(queryset, field, outer='pk'):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef(outer)})
+            .order_by().values(field).annotate(total=Count('pk'))
+            .values('total'),
+            output_field=IntegerField()),
+        0)
+
+
+def _repair(queryset, field, actual):
+    return queryset.annotate(actual=actual).exclude(
+        **{field: F('actual')}).update(**{field: actual})
+
+
+def recount():
+    missing = User.objects.filter(profile=None).values_list('pk', flat=True)
+    created = len(Profile.objects.bulk_create(
+        [Profile(user_id=pk) for pk in missing.iterator()],
+        batch_size=500))
+    profiles = Profile.objects.all()
+    return {
+        'profiles': created,
+        'comments': _repair(
+            Post.objects.all(), 'comments_count',
+            _count(Comment.objects.all(), 'post')),
+        'posts': _repair(
+            profiles, 'posts_count',
+            _count(Post.objects.all(), 'author', 'user_id')),
+        'followers': _repair(
+            profiles, 'followers_count',
+            _count(Follow.objects.all(), 'author', 'user_id')),
+        'following': _repair(
+            profiles, 'following_count',
+            _count(Follow.objects.all(), 'user', 'user_id')),
+    }
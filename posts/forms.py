@@ -1,12 +1,38 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image
 
+from . import images
 from .models import Comment, Post
 
 
+class IngestImageField(forms.ImageField):
+    """ImageField, который читает только заголовок картинки."""
+
+    def to_python(self, data):
+        file = forms.FileField.to_python(self, data)
+        if file is None:
+            return None
+        image = images.inspect(file)
+        file.image = image
+        file.content_type = Image.MIME.get(image.format)
+        images._rewind(file)
+        return file
+
+
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         fields = ('text', 'group', 'image', )
+        field_classes = {'image': IngestImageField}
+
+    def save(self, commit=True):
+        # Картинка перекодируется и пишется в хранилище только здесь:
+        # при ошибке в другом поле файл не нужен.
+        image = self.cleaned_data.get('image')
+        if isinstance(image, UploadedFile):
+            self.instance.image = images.ingest(image)
+        return super().save(commit)
 
 
 class CommentForm(forms.ModelForm):
@@ -0,0 +1,98 @@
+import hashlib
+import io
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+UPLOAD_DIR = 'posts'
+ALPHA_MODES = ('RGBA', 'LA', 'PA')
+
+
+def max_pixels():
+    return getattr(settings, 'IMAGE_MAX_PIXELS', 16000000)
+
+
+def max_side():
+    return getattr(settings, 'IMAGE_MAX_SIDE', 2048)
+
+
+def quality():
+    return getattr(settings, 'IMAGE_QUALITY', 85)
+
+
+def _rewind(file):
+    if hasattr(file, 'seek'):
+        file.seek(0)
+
+
+def has_alpha(image):
+    return image.mode in ALPHA_MODES or 'transparency' in image.info
+
+
+def inspect(file):
+    """Открывает картинку без декодирования пикселей и проверяет размер.
+
+    Для JPEG включает draft-режим: декодер сразу уменьшает картинку
+    в 2-8 раз, поэтому в лимит попадает уже уменьшенный размер.
+    """
+    _rewind(file)
+    try:
+        image = Image.open(file)
+        if image.format == 'JPEG':
+            image.draft('RGB', (max_side(), max_side()))
+        width, height = image.size
+    except Exception as error:
+        raise ValidationError(
+            'Загрузите правильное изображение. Файл, который вы загрузили, '
+            'поврежден или не является изображением.',
+            code='invalid_image') from error
+    if width * height > max_pixels():
+        raise ValidationError(
+            'Слишком большое изображение: %(width)sx%(height)s.',
+            code='image_too_large',
+            params={'width': width, 'height': height})
+    return image
+
+
+def content_name(file, extension):
+    digest = hashlib.sha256()
+    _rewind(file)
+    for chunk in file.chunks() if hasattr(file, 'chunks') else [file.read()]:
+        digest.update(chunk)
+    return f'{UPLOAD_DIR}/{digest.hexdigest()}.{extension}'
+
+
+def encode(image):
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((max_side(), max_side()), Image.LANCZOS)
+    output = io.BytesIO()
+    if has_alpha(image):
+        image.convert('RGBA').save(
+            output, 'WEBP', quality=quality(), method=4)
+    else:
+        image.convert('RGB').save(
+            output, 'JPEG', quality=quality(),
+            optimize=True, progressive=True)
+    return output.getvalue()
+
+
+def ingest(file):
+    """Сохраняет загруженную картинку уменьшенной и без EXIF.
+
+    Имя файла - хэш содержимого загрузки, поэтому одинаковые картинки
+    хранятся в одном файле. Возвращает имя в хранилище.
+    """
+    image = inspect(file)
+    name = content_name(file, 'webp' if has_alpha(image) else 'jpg')
+    if not default_storage.exists(name):
+        _rewind(file)
+        image = inspect(file)
+        try:
+            data = encode(image)
+        finally:
+            image.close()
+        name = default_storage.save(name, ContentFile(data))
+    return name
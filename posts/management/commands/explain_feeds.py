@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Comment, Follow, Post
+from posts.timeline import Timeline
+
+FEED_ORDERING = ('-pub_date', '-pk')
+
+
+class Command(BaseCommand):
+    help = 'Выводит планы выполнения основных запросов лент.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, default=1)
+        parser.add_argument('--author', type=int, default=1)
+        parser.add_argument('--group', type=int, default=1)
+        parser.add_argument('--post', type=int, default=1)
+        parser.add_argument('--per-page', type=int, default=10)
+
+    def queries(self, options):
+        limit = options['per_page'] + 1
+        feed = Post.objects.feed().order_by(*FEED_ORDERING)
+        timeline = Timeline(options['user'])
+        return {
+            'index': feed[:limit],
+            'group': feed.filter(group_id=options['group'])[:limit],
+            'profile': feed.filter(author_id=options['author'])[:limit],
+            'follow_index': timeline.pushed()[:limit],
+            'follow_index_pull': timeline.pulled()[:limit],
+            'post': Comment.objects.filter(
+                post_id=options['post']).order_by('-created', '-pk')[:limit],
+            'profile_follow': Follow.objects.filter(
+                user_id=options['user'], author_id=options['author'])[:1],
+        }
+
+    def handle(self, *args, **options):
+        for view, queryset in self.queries(options).items():
+            self.stdout.write(self.style.MIGRATE_HEADING(view))
+            self.stdout.write(queryset.explain())
+            self.stdout.write('')
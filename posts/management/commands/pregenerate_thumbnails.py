@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Готовит миниатюры для уже загруженных картинок записей.'
+
+    def handle(self, *args, **options):
+        names = Post.objects.exclude(image='').exclude(
+            image__isnull=True).values_list('image', flat=True).distinct()
+        total = 0
+        for name in names.iterator():
+            if thumbnails.card(name) is None:
+                thumbnails.generate(name)
+                total += 1
+        self.stdout.write(f'Подготовлено миниатюр для картинок: {total}')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.search import rebuild, uses_fts
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс по записям.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild()
+        backend = 'FTS5' if uses_fts() else 'SearchTerm'
+        self.stdout.write(f'Поисковый индекс перестроен ({backend}).')
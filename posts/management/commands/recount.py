@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.counters import recount
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики записей, комментариев и подписок.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            repaired = recount()
+        for name, total in repaired.items():
+            self.stdout.write(f'{name}: {total}')
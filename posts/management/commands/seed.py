@@ -0,0 +1,226 @@
+import io
+import itertools
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from PIL import Image
+
+from posts import search, timeline
+from posts.counters import recount
+from posts.images import ingest
+from posts.models import Comment, Follow, Group, Post, User
+
+WORDS = (
+    'утро', 'город', 'дорога', 'книга', 'море', 'снег', 'друг', 'письмо',
+    'вечер', 'поезд', 'окно', 'песня', 'лес', 'река', 'дом', 'кофе',
+    'работа', 'отпуск', 'фото', 'кино', 'солнце', 'дождь', 'ветер', 'сад',
+    'новый', 'старый', 'тихий', 'долгий', 'яркий', 'тёплый', 'первый',
+    'сегодня', 'вчера', 'снова', 'наконец', 'очень', 'почти', 'всегда',
+    'читать', 'гулять', 'ждать', 'писать', 'думать', 'смотреть', 'ехать',
+)
+IMAGE_SIZE = (960, 540)
+
+
+@contextmanager
+def explicit_dates(*fields):
+    """Отключает auto_now_add, чтобы bulk_create сохранил заданные даты."""
+    saved = [field.auto_now_add for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in zip(fields, saved):
+            field.auto_now_add = value
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def inserted_ids(model, after):
+    """Ключи строк, добавленных после ``after``, без загрузки списка."""
+    queryset = model.objects.filter(pk__gt=after or 0)
+    bounds = queryset.aggregate(
+        first=Min('pk'), last=Max('pk'), total=Count('pk'))
+    if not bounds['total']:
+        return []
+    if bounds['last'] - bounds['first'] + 1 == bounds['total']:
+        return range(bounds['first'], bounds['last'] + 1)
+    return list(queryset.order_by('pk').values_list('pk', flat=True))
+
+
+class PowerLaw:
+    """Выбор элементов с вероятностью, пропорциональной 1 / rank ** alpha."""
+
+    def __init__(self, items, alpha, rnd):
+        self.items = items
+        self.rnd = rnd
+        self.weights = list(itertools.accumulate(
+            1 / rank ** alpha for rank in range(1, len(items) + 1)))
+
+    def sample(self, k=1):
+        return self.rnd.choices(self.items, cum_weights=self.weights, k=k)
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими пользователями, группами, '
+            'записями, комментариями и подписками для нагрузочных тестов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Среднее число подписок на пользователя.')
+        parser.add_argument(
+            '--images', type=int, default=0,
+            help='Число разных картинок; 0 — записи без картинок.')
+        parser.add_argument('--image-ratio', type=float, default=0.2)
+        parser.add_argument('--alpha', type=float, default=1.2)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--chunk', type=int, default=5000)
+        parser.add_argument('--prefix', default='seed')
+        parser.add_argument('--start', default='2020-01-01')
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--password', default='seed-password')
+
+    def moment(self):
+        return self.start + timedelta(
+            seconds=self.rnd.uniform(0, self.span))
+
+    def text(self, low, high):
+        words = self.rnd.choices(WORDS, k=self.rnd.randint(low, high))
+        return ' '.join(words).capitalize() + '.'
+
+    def insert(self, model, objects, label):
+        started = time.monotonic()
+        total = 0
+        for chunk in chunks(objects, self.chunk):
+            model.objects.bulk_create(chunk)
+            total += len(chunk)
+        self.stdout.write(
+            f'{label}: {total} за {time.monotonic() - started:.1f} с')
+
+    def users(self, count, password):
+        hashed = make_password(password)
+        for number in range(count):
+            yield User(
+                username=f'{self.prefix}{number}', password=hashed,
+                date_joined=self.start)
+
+    def groups(self, count):
+        for number in range(count):
+            yield Group(
+                title=f'Группа {self.prefix}-{number}',
+                slug=f'{self.prefix}-{number}',
+                description=self.text(5, 15))
+
+    def images(self, count):
+        names = []
+        for number in range(count):
+            color = tuple(self.rnd.randrange(256) for _ in range(3))
+            buffer = io.BytesIO()
+            Image.new('RGB', IMAGE_SIZE, color).save(buffer, 'JPEG')
+            names.append(ingest(SimpleUploadedFile(
+                f'{self.prefix}{number}.jpg', buffer.getvalue(),
+                'image/jpeg')))
+        return names
+
+    def posts(self, count, authors, groups, images, ratio):
+        rnd = self.rnd
+        for author_id in authors.sample(count):
+            yield Post(
+                text=self.text(5, 60), author_id=author_id,
+                group_id=(
+                    rnd.choice(groups) if groups and rnd.random() < 0.5
+                    else None),
+                image=(
+                    rnd.choice(images) if images and rnd.random() < ratio
+                    else None),
+                pub_date=self.moment())
+
+    def comments(self, count, users, posts):
+        rnd = self.rnd
+        for _ in range(count):
+            yield Comment(
+                post_id=rnd.choice(posts), author_id=rnd.choice(users),
+                text=self.text(3, 30), created=self.moment())
+
+    def follows(self, users, authors, average):
+        rnd = self.rnd
+        for user_id in users:
+            wanted = min(rnd.randint(0, 2 * average), len(users) - 1)
+            chosen = set()
+            for author_id in authors.sample(wanted * 2):
+                if len(chosen) == wanted:
+                    break
+                if author_id != user_id:
+                    chosen.add(author_id)
+            for author_id in sorted(chosen):
+                yield Follow(user_id=user_id, author_id=author_id)
+
+    def step(self, label, function):
+        started = time.monotonic()
+        with transaction.atomic():
+            function()
+        self.stdout.write(
+            f'{label}: {time.monotonic() - started:.1f} с')
+
+    def handle(self, *args, **options):
+        self.rnd = random.Random(options['seed'])
+        self.chunk = options['chunk']
+        self.prefix = options['prefix']
+        self.start = datetime.strptime(
+            options['start'], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        self.span = options['days'] * 86400
+        if (User.objects.filter(username__startswith=self.prefix).exists()
+                or Group.objects.filter(slug__startswith=self.prefix)
+                .exists()):
+            raise CommandError(
+                f'Данные с префиксом «{self.prefix}» уже есть, '
+                'укажите другой --prefix.')
+        last_user = User.objects.aggregate(last=Max('pk'))['last']
+        last_group = Group.objects.aggregate(last=Max('pk'))['last']
+        last_post = Post.objects.aggregate(last=Max('pk'))['last']
+
+        self.insert(User, self.users(
+            options['users'], options['password']), 'Пользователи')
+        self.insert(Group, self.groups(options['groups']), 'Группы')
+        users = inserted_ids(User, last_user)
+        groups = inserted_ids(Group, last_group)
+        if not users:
+            raise CommandError('Нужен хотя бы один пользователь.')
+        authors = PowerLaw(users, options['alpha'], self.rnd)
+        images = self.images(options['images'])
+        with explicit_dates(Post._meta.get_field('pub_date'),
+                            Comment._meta.get_field('created')):
+            self.insert(Post, self.posts(
+                options['posts'], authors, groups, images,
+                options['image_ratio']), 'Записи')
+            posts = inserted_ids(Post, last_post)
+            if posts:
+                self.insert(Comment, self.comments(
+                    options['comments'], users, posts), 'Комментарии')
+        self.insert(Follow, self.follows(
+            users, authors, options['follows']), 'Подписки')
+
+        self.step('Счётчики', recount)
+        self.step('Ленты подписок', timeline.rebuild)
+        self.step('Поисковый индекс', search.rebuild)
+        cache.clear()
@@ -0,0 +1,77 @@
+# Generated by Django 2.2.6 on 2026-10-18 04:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+FTS_TABLE = 'posts_post_search'
+
+
+def fts5_supported(schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return False
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        options = {row[0] for row in cursor.fetchall()}
+    return 'ENABLE_FTS5' in options
+
+
+def create_index(apps, schema_editor):
+    if fts5_supported(schema_editor):
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+            'text, group_title, '
+            'tokenize="unicode61 remove_diacritics 2")')
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, text, group_title) '
+            "SELECT p.id, p.text, COALESCE(g.title, '') "
+            'FROM posts_post p '
+            'LEFT JOIN posts_group g ON g.id = p.group_id')
+        return
+    import re
+    from collections import Counter
+
+    Post = apps.get_model('posts', 'Post')
+    SearchTerm = apps.get_model('posts', 'SearchTerm')
+    batch = []
+    rows = Post.objects.values_list('pk', 'text', 'group__title')
+    for pk, text, title in rows.iterator():
+        weights = Counter(re.findall(r'\w+', text.lower()))
+        for token in re.findall(r'\w+', (title or '').lower()):
+            weights[token] += 2
+        batch.extend(
+            SearchTerm(term=term[:64], post_id=pk, weight=weight)
+            for term, weight in weights.items())
+    SearchTerm.objects.bulk_create(batch, batch_size=500)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_change_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Слово')),
+                ('weight', models.PositiveIntegerField(default=1, verbose_name='Вес')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='posts.Post', verbose_name='Запись')),
+            ],
+            options={
+                'verbose_name': 'Слово поискового индекса',
+                'verbose_name_plural': 'Поисковый индекс',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='searchterm',
+            index=models.Index(fields=['term', 'post'], name='posts_searc_term_27a9f7_idx'),
+        ),
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -4,6 +4,11 @@ from django.db import models
 User = get_user_model()
 
 
+class PostQuerySet(models.QuerySet):
+    def feed(self):
+        return self.select_related('author', 'group')
+
+
 class Post(models.Model):
     text = models.TextField(
         verbose_name='Ваша запись',
@@ -28,10 +33,21 @@ class Post(models.Model):
         help_text='Добавьте картинку в дополнение к записи.',
         blank=True, null=True)
 
+    comments_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0, editable=False)
+
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         ordering = ['-pub_date']
         verbose_name = 'Запись'
         verbose_name_plural = 'Записи'
+        indexes = [
+            models.Index(fields=['-pub_date', '-id']),
+            models.Index(fields=['author', '-pub_date', '-id']),
+            models.Index(fields=['group', '-pub_date', '-id']),
+        ]
 
     def __str__(self):
         return self.text[:15]
@@ -82,6 +98,9 @@ class Comment(models.Model):
         ordering = ['-created']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(fields=['post', '-created', '-id']),
+        ]
 
     def __str__(self):
         return self.text[:15]
@@ -102,3 +121,105 @@ class Follow(models.Model):
     class Meta:
         verbose_name = 'Подписки'
         verbose_name_plural = 'Подписки'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'], name='unique_follow'),
+        ]
+
+
+class Profile(models.Model):
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE,
+        related_name='profile',
+        verbose_name='Пользователь'
+    )
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Записей', default=0)
+    followers_count = models.PositiveIntegerField(
+        verbose_name='Подписчиков', default=0)
+    following_count = models.PositiveIntegerField(
+        verbose_name='Подписок', default=0)
+
+    class Meta:
+        verbose_name = 'Профиль'
+        verbose_name_plural = 'Профили'
+
+    def __str__(self):
+        return str(self.user)
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Подписчик'
+    )
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Запись'
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации')
+
+    class Meta:
+        ordering = ['-pub_date']
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Лента подписок'
+        indexes = [
+            models.Index(fields=['user', '-pub_date']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'], name='unique_timeline_entry'),
+        ]
+
+
+class SearchTerm(models.Model):
+    term = models.CharField(
+        verbose_name='Слово', max_length=64)
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE,
+        related_name='search_terms',
+        verbose_name='Запись')
+    weight = models.PositiveIntegerField(
+        verbose_name='Вес', default=1)
+
+    class Meta:
+        verbose_name = 'Слово поискового индекса'
+        verbose_name_plural = 'Поисковый индекс'
+        indexes = [
+            models.Index(fields=['term', 'post']),
+        ]
+
+
+class Change(models.Model):
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ACTIONS = (
+        (CREATED, 'Создание'),
+        (UPDATED, 'Изменение'),
+        (DELETED, 'Удаление'),
+    )
+
+    model = models.CharField(
+        verbose_name='Модель', max_length=20)
+    object_id = models.PositiveIntegerField(
+        verbose_name='ID объекта')
+    action = models.CharField(
+        verbose_name='Действие', max_length=10, choices=ACTIONS)
+    owner = models.PositiveIntegerField(
+        verbose_name='Владелец',
+        help_text='ID пользователя, которому видно изменение.',
+        blank=True, null=True)
+    created = models.DateTimeField(
+        verbose_name='Дата изменения', auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['pk']
+        verbose_name = 'Изменение'
+        verbose_name_plural = 'Журнал изменений'
+
+    def __str__(self):
+        return f'{self.action} {self.model} {self.object_id}'
@@ -0,0 +1,125 @@
+import base64
+import binascii
+from datetime import datetime, timezone
+
+from django.db.models import Q
+
+
+def encode_cursor(value, pk):
+    timestamp = '' if value is None else int(value.timestamp() * 1000000)
+    raw = f'{timestamp}.{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        timestamp, pk = base64.urlsafe_b64decode(padded).decode().split('.')
+        if not timestamp:
+            return None, int(pk)
+        value = datetime.fromtimestamp(
+            int(timestamp) / 1000000, tz=timezone.utc)
+        return value, int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError, OverflowError,
+            OSError):
+        return None
+
+
+def keyset_filter(queryset, field, cursor, newer, key='pk'):
+    value, pk = cursor
+    lookup = 'gt' if newer else 'lt'
+    if field is None or value is None:
+        return queryset.filter(**{f'{key}__{lookup}': pk})
+    return queryset.filter(
+        Q(**{f'{field}__{lookup}': value})
+        | Q(**{field: value, f'{key}__{lookup}': pk})
+    )
+
+
+class CursorPage:
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous,
+                 token=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.token = token
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage {self.token or "first"}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def _cursor(self, obj):
+        field = self.paginator.field
+        if isinstance(obj, dict):
+            return encode_cursor(obj[field] if field else None, obj['id'])
+        return encode_cursor(getattr(obj, field) if field else None, obj.pk)
+
+    def next_cursor(self):
+        if self.has_next():
+            return self._cursor(self.object_list[-1])
+
+    def previous_cursor(self):
+        if self.has_previous():
+            return self._cursor(self.object_list[0])
+
+
+class CursorPaginator:
+    """Keyset-пагинация по паре (field, id) без COUNT(*) и OFFSET.
+
+    Записи отдаются от новых к старым; курсор ``after`` ведёт к более
+    старым записям, ``before`` к более новым. При field=None ключом
+    служит только id.
+    """
+
+    def __init__(self, object_list, per_page, field='pub_date'):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.field = field
+        self.ordering = [field, 'pk'] if field else ['pk']
+
+    def _descending(self):
+        return [f'-{name}' for name in self.ordering]
+
+    def rows(self, cursor, newer, limit):
+        """До limit строк после курсора: новее него по возрастанию или
+        старше него по убыванию."""
+        queryset = self.object_list
+        if cursor is not None:
+            queryset = keyset_filter(queryset, self.field, cursor, newer)
+        ordering = self.ordering if newer else self._descending()
+        return list(queryset.order_by(*ordering)[:limit])
+
+    def get_page(self, after=None, before=None):
+        cursor = decode_cursor(before) if before else None
+        if cursor is not None:
+            rows = self.rows(cursor, True, self.per_page + 1)
+            if rows:
+                has_previous = len(rows) > self.per_page
+                rows = rows[:self.per_page][::-1]
+                return CursorPage(rows, self, True, has_previous, before)
+        cursor = decode_cursor(after) if after else None
+        rows = self.rows(cursor, False, self.per_page + 1)
+        has_next = len(rows) > self.per_page
+        return CursorPage(
+            rows[:self.per_page], self, has_next, cursor is not None,
+            after if cursor is not None else None)
@@ -0,0 +1,125 @@
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Sum
+
+from .models import Group, Post, SearchTerm
+
+FTS_TABLE = 'posts_post_search'
+TITLE_WEIGHT = 2
+
+_fts_available = {}
+
+
+def tokenize(text):
+    return [token[:64] for token in re.findall(r'\w+', text.lower())]
+
+
+def uses_fts():
+    alias = connection.alias
+    if alias not in _fts_available:
+        _fts_available[alias] = (
+            connection.vendor == 'sqlite'
+            and FTS_TABLE in connection.introspection.table_names())
+    return _fts_available[alias]
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def max_results():
+    return getattr(settings, 'SEARCH_MAX_RESULTS', 1000)
+
+
+def _terms(post_id, text, title):
+    weights = Counter(tokenize(text))
+    for token in tokenize(title):
+        weights[token] += TITLE_WEIGHT
+    return [SearchTerm(term=term, post_id=post_id, weight=weight)
+            for term, weight in weights.items()]
+
+
+def index_post(post):
+    title = post.group.title if post.group_id else ''
+    if uses_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.pk])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, text, group_title) '
+                'VALUES (%s, %s, %s)', [post.pk, post.text, title])
+        return
+    SearchTerm.objects.filter(post_id=post.pk).delete()
+    SearchTerm.objects.bulk_create(_terms(post.pk, post.text, title))
+
+
+def unindex_post(post_id):
+    if uses_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id])
+        return
+    SearchTerm.objects.filter(post_id=post_id).delete()
+
+
+def index_group(group, title=None):
+    title = group.title if title is None else title
+    posts = Post.objects.filter(group=group).select_related('group')
+    if uses_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {FTS_TABLE} SET group_title = %s WHERE rowid IN '
+                f'(SELECT id FROM {_table(Post)} WHERE group_id = %s)',
+                [title, group.pk])
+        return
+    for post in posts.iterator():
+        SearchTerm.objects.filter(post_id=post.pk).delete()
+        SearchTerm.objects.bulk_create(_terms(post.pk, post.text, title))
+
+
+def rebuild():
+    if uses_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, text, group_title) '
+                'SELECT p.id, p.text, COALESCE(g.title, \'\') '
+                f'FROM {_table(Post)} p '
+                f'LEFT JOIN {_table(Group)} g ON g.id = p.group_id')
+        return
+    SearchTerm.objects.all().delete()
+    rows = Post.objects.values_list('pk', 'text', 'group__title')
+    batch = []
+    for pk, text, title in rows.iterator():
+        batch.extend(_terms(pk, text, title or ''))
+        if len(batch) >= 1000:
+            SearchTerm.objects.bulk_create(batch)
+            batch = []
+    SearchTerm.objects.bulk_create(batch)
+
+
+def search(query, limit=None):
+    """Возвращает id записей, найденных по запросу, по убыванию релевантности.
+    """
+    tokens = list(dict.fromkeys(tokenize(query)))
+    if not tokens:
+        return []
+    limit = limit or max_results()
+    if uses_fts():
+        match = ' '.join(f'"{token}"' for token in tokens)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}, 1.0, {TITLE_WEIGHT}.0), '
+                'rowid DESC LIMIT %s', [match, limit])
+            return [row[0] for row in cursor.fetchall()]
+    return list(
+        SearchTerm.objects.filter(term__in=tokens)
+        .values('post').annotate(
+            matched=Count('term', distinct=True), score=Sum('weight'))
+        .filter(matched=len(tokens))
+        .order_by('-score', '-post')
+        .values_list('post', flat=True)[:limit])
@@ -0,0 +1,191 @@
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save)
+from django.dispatch import receiver
+
+from . import cache, changes, counters, search, thumbnails, timeline
+from .models import Change, Comment, Follow, Group, Post, Profile, User
+
+
+@receiver(post_save, sender=User)
+def create_profile(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Profile.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        timeline.fan_out(instance)
+
+
+@receiver(post_save, sender=Post)
+def pregenerate_thumbnails(sender, instance, raw=False, **kwargs):
+    if not raw:
+        thumbnails.schedule(instance)
+
+
+@receiver(post_save, sender=Post)
+def count_post(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.bump_profile(instance.author_id, 'posts_count', 1)
+
+
+@receiver(post_delete, sender=Post)
+def uncount_post(sender, instance, **kwargs):
+    counters.bump_profile(instance.author_id, 'posts_count', -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.bump_comments(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    counters.bump_comments(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def count_follow(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.bump_profile(instance.user_id, 'following_count', 1)
+        counters.bump_profile(instance.author_id, 'followers_count', 1)
+
+
+@receiver(post_delete, sender=Follow)
+def uncount_follow(sender, instance, **kwargs):
+    counters.bump_profile(instance.user_id, 'following_count', -1)
+    counters.bump_profile(instance.author_id, 'followers_count', -1)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        timeline.backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def prune_timeline(sender, instance, **kwargs):
+    timeline.prune(instance.user_id, instance.author_id)
+    # uncount_follow подключён раньше, followers_count уже уменьшен.
+    timeline.follower_lost(instance.author_id)
+
+
+@receiver(pre_save, sender=Post)
+def remember_group(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._previous_group_slug = Post.objects.filter(
+            pk=instance.pk).values_list('group__slug', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    group = instance.group if instance.group_id else None
+    scopes = cache.post_scopes(
+        instance.author.username, group.slug if group else None)
+    previous_group_slug = getattr(instance, '_previous_group_slug', None)
+    if previous_group_slug is not None:
+        scopes.append(f'group:{previous_group_slug}')
+    cache.bump(*scopes)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    post = Post.objects.filter(pk=instance.post_id).values_list(
+        'author__username', 'group__slug').first()
+    if post is not None:
+        cache.bump(*cache.post_scopes(*post))
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow(sender, instance, **kwargs):
+    scopes = [
+        f'follower:{instance.user_id}', f'author:{instance.user.username}']
+    if instance.author_id is not None:
+        scopes.append(f'author:{instance.author.username}')
+    cache.bump(*scopes)
+
+
+@receiver(pre_save, sender=Group)
+def remember_slug_and_title(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._previous_slug, instance._previous_title = (
+            Group.objects.filter(pk=instance.pk).values_list(
+                'slug', 'title').first() or (None, None))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group(sender, instance, **kwargs):
+    scopes = ['posts', f'group:{instance.slug}']
+    previous_slug = getattr(instance, '_previous_slug', None)
+    if previous_slug is not None:
+        scopes.append(f'group:{previous_slug}')
+    cache.bump(*scopes)
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, raw=False, update_fields=None,
+                      **kwargs):
+    if (instance.pk and not raw
+            and (update_fields is None or 'username' in update_fields)):
+        instance._previous_username = User.objects.filter(
+            pk=instance.pk).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def invalidate_renamed_user(sender, instance, **kwargs):
+    previous_username = getattr(instance, '_previous_username', None)
+    if previous_username not in (None, instance.username):
+        cache.bump(
+            f'author:{previous_username}', f'author:{instance.username}')
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    cache.bump(f'author:{instance.username}')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Follow)
+@receiver(post_save, sender=Group)
+def log_save(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        changes.record(
+            instance, Change.CREATED if created else Change.UPDATED)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Follow)
+@receiver(post_delete, sender=Group)
+def log_delete(sender, instance, **kwargs):
+    changes.record(instance, Change.DELETED)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    search.unindex_post(instance.pk)
+
+
+@receiver(post_save, sender=Group)
+def reindex_group(sender, instance, created, raw=False, **kwargs):
+    if (not created and not raw
+            and getattr(instance, '_previous_title', None) != instance.title):
+        search.index_group(instance)
+
+
+@receiver(pre_delete, sender=Group)
+def unindex_group(sender, instance, **kwargs):
+    search.index_group(instance, title='')
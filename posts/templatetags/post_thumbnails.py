@@ -0,0 +1,18 @@
+from django import template
+
+from posts import thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def prefetch_thumbnails(page):
+    thumbnails.prefetch(page)
+    return ''
+
+
+@register.simple_tag
+def card_thumbnail(post):
+    if not hasattr(post, 'card_thumbnail'):
+        thumbnails.prefetch([post])
+    return post.card_thumbnail
@@ -1,11 +1,16 @@
+import io
 import shutil
 import tempfile
 
 from django.conf import settings
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from PIL import Image
 
+from posts import images
+from posts.forms import PostForm
 from posts.models import Comment, Group, Post, User
 
 AUTHOR_USERNAME = 'PostTestUser'
@@ -155,3 +160,83 @@ class PostCreateFormTests(TestCase):
             response, self.POST_URL, 302, 200,
             'Проверьте перенаправляете ли, вы пользователя'
             'после отправки формы с add_comment на post.')
+
+
+def make_upload(mode='RGB', size=(400, 200), image_format='PNG',
+                name='big.png', **save_options):
+    output = io.BytesIO()
+    Image.new(mode, size, 'red').save(output, image_format, **save_options)
+    return SimpleUploadedFile(
+        name=name,
+        content=output.getvalue(),
+        content_type=f'image/{image_format.lower()}'
+    )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_MAX_SIDE=100)
+class ImageIngestTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def save_image(self, upload):
+        form = PostForm(data={'text': POST_TEXT}, files={'image': upload})
+        self.assertTrue(form.is_valid(), form.errors)
+        return form.save(commit=False).image.name
+
+    def test_image_downscaled_and_reencoded(self):
+        """Проверка уменьшения и перекодирования загруженной картинки."""
+        exif = Image.Exif()
+        exif[0x010f] = 'Camera'
+        name = self.save_image(make_upload(
+            image_format='JPEG', name='photo.jpg', exif=exif.tobytes()))
+        self.assertRegex(
+            name, r'^posts/[0-9a-f]{64}\.jpg$',
+            'Имя файла должно быть хэшем содержимого.')
+        with default_storage.open(name) as file:
+            image = Image.open(file)
+            self.assertEqual(
+                image.size, (100, 50),
+                'Большие картинки должны уменьшаться.')
+            self.assertTrue(
+                image.info.get('progressive'),
+                'Картинка должна сохраняться как progressive JPEG.')
+            self.assertNotIn(
+                'exif', image.info,
+                'EXIF должен удаляться из картинки.')
+
+    def test_alpha_image_stored_as_webp(self):
+        """Проверка сохранения картинок с прозрачностью в WebP."""
+        name = self.save_image(make_upload(mode='RGBA'))
+        self.assertTrue(
+            name.endswith('.webp'),
+            'Картинки с прозрачностью должны сохраняться в WebP.')
+
+    def test_duplicate_uploads_share_file(self):
+        """Проверка хранения одинаковых загрузок в одном файле."""
+        first = self.save_image(make_upload())
+        second = self.save_image(make_upload(name='copy.png'))
+        self.assertEqual(
+            first, second,
+            'Одинаковые картинки должны храниться в одном файле.')
+
+    @override_settings(IMAGE_MAX_PIXELS=1000)
+    def test_too_large_image_rejected(self):
+        """Проверка ограничения числа пикселей картинки."""
+        form = PostForm(
+            data={'text': POST_TEXT}, files={'image': make_upload()})
+        self.assertFalse(
+            form.is_valid(),
+            'Слишком большие картинки должны отклоняться.')
+        self.assertIn('image', form.errors)
+
+    def test_invalid_form_stores_nothing(self):
+        """Проверка, что отклонённая форма не сохраняет картинку."""
+        upload = make_upload(size=(300, 300))
+        name = images.content_name(upload, 'jpg')
+        form = PostForm(data={'text': ''}, files={'image': upload})
+        self.assertFalse(form.is_valid())
+        self.assertFalse(
+            default_storage.exists(name),
+            'Картинка не должна сохраняться, пока форма не прошла проверку.')
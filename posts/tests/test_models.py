@@ -1,8 +1,18 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
 
-from posts.models import Comment, Group, Post, User
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+
+from posts import search
+from posts.models import (Comment, Follow, Group, Post, Profile,
+                          TimelineEntry, User)
 
 AUTHOR_USERNAME = 'PostTestUser'
+FOLLOWER_USERNAME = 'FollowTestUser'
 
 GROUP_TITLE = 'Тестовая группа'
 GROUP_DESCRIPTION = 'Тестовое описание'
@@ -39,6 +49,12 @@ POST_TEXT = 'Длинный тестовый текст, больше 15 сим
 
 COMMENT_TEXT = 'Длинный текст комментария, больше 15 символов'
 
+MEDIA_ROOT = tempfile.mkdtemp()
+SEED_OPTIONS = {
+    'users': 30, 'groups': 3, 'posts': 200, 'comments': 100,
+    'follows': 3, 'seed': 7, 'chunk': 50,
+}
+
 
 class PostModelTest(TestCase):
     def setUp(self):
@@ -130,3 +146,128 @@ class PostModelTest(TestCase):
             expected_group_object_name,
             str(self.group),
             'Поле __str__ в классе Group не совпадает с ожидаемым.')
+
+
+class CountersTest(TestCase):
+    def setUp(self):
+        self.author = User.objects.create(username=AUTHOR_USERNAME)
+        self.follower = User.objects.create(username=FOLLOWER_USERNAME)
+        self.post = Post.objects.create(
+            text=POST_TEXT,
+            author=self.author,
+        )
+
+    def counters(self, user):
+        profile = Profile.objects.get(user=user)
+        return (
+            profile.posts_count,
+            profile.followers_count,
+            profile.following_count,
+        )
+
+    def test_counters_follow_changes(self):
+        """Проверка обновления счётчиков при изменениях."""
+        comment = Comment.objects.create(
+            post=self.post, author=self.follower, text=COMMENT_TEXT)
+        follow = Follow.objects.create(
+            user=self.follower, author=self.author)
+        self.post.refresh_from_db()
+        self.assertEqual(
+            self.post.comments_count, 1,
+            'Проверьте счётчик комментариев.')
+        self.assertEqual(
+            self.counters(self.author), (1, 1, 0),
+            'Проверьте счётчики автора.')
+        self.assertEqual(
+            self.counters(self.follower), (0, 0, 1),
+            'Проверьте счётчики подписчика.')
+        comment.delete()
+        follow.delete()
+        self.post.refresh_from_db()
+        self.assertEqual(
+            self.post.comments_count, 0,
+            'Проверьте счётчик комментариев после удаления.')
+        self.assertEqual(
+            self.counters(self.author), (1, 0, 0),
+            'Проверьте счётчики автора после отписки.')
+
+    def test_drifted_counter_does_not_break_delete(self):
+        """Проверка удаления при счётчике, ушедшем в ноль."""
+        comment = Comment.objects.create(
+            post=self.post, author=self.follower, text=COMMENT_TEXT)
+        Post.objects.update(comments_count=0)
+        comment.delete()
+        self.post.refresh_from_db()
+        self.assertEqual(
+            self.post.comments_count, 0,
+            'Счётчик не должен уходить ниже нуля.')
+
+    def test_recount_repairs_drift(self):
+        """Проверка команды recount."""
+        Comment.objects.create(
+            post=self.post, author=self.follower, text=COMMENT_TEXT)
+        Follow.objects.create(user=self.follower, author=self.author)
+        Post.objects.update(comments_count=5)
+        Profile.objects.update(
+            posts_count=7, followers_count=7, following_count=7)
+        Profile.objects.filter(user=self.follower).delete()
+        call_command('recount', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(
+            self.post.comments_count, 1,
+            'recount должен исправлять счётчик комментариев.')
+        self.assertEqual(
+            self.counters(self.author), (1, 1, 0),
+            'recount должен исправлять счётчики автора.')
+        self.assertEqual(
+            self.counters(self.follower), (0, 0, 1),
+            'recount должен создавать недостающие профили.')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class SeedCommandTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def seed(self, prefix, **options):
+        call_command(
+            'seed', prefix=prefix, stdout=StringIO(),
+            **dict(SEED_OPTIONS, **options))
+        return Post.objects.filter(
+            author__username__startswith=prefix).order_by('pk')
+
+    def test_seed_creates_dataset(self):
+        """Проверка объёма и связности сгенерированных данных."""
+        posts = self.seed('first', images=2)
+        self.assertEqual(posts.count(), 200, 'Проверьте число записей.')
+        self.assertEqual(Comment.objects.count(), 100)
+        self.assertTrue(
+            posts.exclude(image=None).exists(),
+            'Часть записей должна быть с картинками.')
+        self.assertFalse(
+            posts.filter(
+                pub_date__gte=datetime(2021, 1, 1, tzinfo=timezone.utc)
+            ).exists(),
+            'Даты записей должны браться из сида, а не auto_now_add.')
+        self.assertEqual(
+            Profile.objects.aggregate(total=Sum('posts_count'))['total'],
+            200, 'После seed счётчики должны быть пересчитаны.')
+        follows = Follow.objects.values_list('user', 'author')
+        expected = sum(
+            Post.objects.filter(author_id=author).count()
+            for user, author in follows)
+        self.assertEqual(
+            TimelineEntry.objects.count(), expected,
+            'Ленты подписок должны быть перестроены.')
+        word = posts.first().text.split()[0].lower()
+        self.assertTrue(
+            search.search(word), 'Поисковый индекс должен быть перестроен.')
+
+    def test_seed_is_deterministic(self):
+        """Проверка воспроизводимости данных при одном сиде."""
+        first = list(self.seed('first').values_list('text', 'pub_date'))
+        second = list(self.seed('second').values_list('text', 'pub_date'))
+        self.assertEqual(
+            first, second, 'Один сид должен давать одинаковые записи.')
@@ -1,17 +1,26 @@
 import shutil
 import tempfile
+from unittest import mock
 
 from django import forms
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from posts.models import Comment, Follow, Group, Post, User
+from posts import cache as posts_cache
+from posts import thumbnails, timeline
+from posts.models import (
+    Comment, Follow, Group, Post, Profile, TimelineEntry, User)
+from tasks.worker import Worker
 
 AUTHOR_USERNAME = 'PostTestUser'
 FOLLOWER_USERNAME = 'FollowTestUser'
 AUTH_USER_USERNAME = 'TestUser'
+ANOTHER_AUTHOR_USERNAME = 'AnotherTestUser'
 
 GROUP_TITLE = 'Тестовая группа'
 GROUP_DESCRIPTION = 'Тестовое описание'
@@ -22,6 +31,8 @@ ANOTHER_GROUP_SLUG = 'another-test-group'
 ANOTHER_GROUP_DESCRIPTION = 'Другое тестовое описание'
 
 POST_TEXT = 'Тестовый текст'
+POST_TEXT_UPD = 'Тестовый текст изменён'
+ANOTHER_POST_TEXT = 'Запись другого автора'
 POST_IMAGE = (
             b'\x47\x49\x46\x38\x39\x61\x02\x00'
             b'\x01\x00\x80\x00\x00\x00\x00\x00'
@@ -36,6 +47,7 @@ COMMENT_TEXT = 'Тестовый комментарий'
 
 INDEX_URL = reverse('index')
 FOLLOW_INDEX_URL = reverse('follow_index')
+SEARCH_URL = reverse('search')
 GROUP_URL = reverse('group', kwargs={'slug': GROUP_SLUG})
 ANOTHER_GROUP_URL = reverse('group', kwargs={'slug': ANOTHER_GROUP_SLUG})
 NEW_POST_URL = reverse('new_post')
@@ -52,6 +64,8 @@ class PostViewsTests(TestCase):
 
         cls.author = User.objects.create(username=AUTHOR_USERNAME)
         cls.user = User.objects.create(username=FOLLOWER_USERNAME)
+        cls.another_author = User.objects.create(
+            username=ANOTHER_AUTHOR_USERNAME)
 
         Follow.objects.create(user=cls.user, author=cls.author)
 
@@ -100,6 +114,7 @@ class PostViewsTests(TestCase):
         super().tearDownClass()
 
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create(username=AUTH_USER_USERNAME)
         self.guest_client = Client()
         self.auth_client = Client()
@@ -373,43 +388,78 @@ class PostViewsTests(TestCase):
     def test_cache_index(self):
         """Проверка кэширования главной страницы."""
         html_0 = self.guest_client.get(INDEX_URL)
-        Post.objects.create(
-            text=POST_TEXT,
-            author=PostViewsTests.author
-        )
+        Post.objects.filter(pk=self.post_id).update(text=POST_TEXT_UPD)
         html_1 = self.guest_client.get(INDEX_URL)
         self.assertHTMLEqual(
             str(html_0.content),
             str(html_1.content),
             'Проверьте работу cache главной страницы.')
 
-    def test_cache_group(self):
-        """Проверка кэширования страницы группы."""
-        html_0 = self.guest_client.get(ANOTHER_GROUP_URL)
+    def test_cache_index_invalidated_by_new_post(self):
+        """Проверка сброса кэша главной страницы новой записью."""
+        self.guest_client.get(INDEX_URL)
         Post.objects.create(
-            text=POST_TEXT,
-            author=PostViewsTests.author,
-            group=PostViewsTests.another_group
+            text=POST_TEXT_UPD,
+            author=PostViewsTests.author
         )
-        html_1 = self.guest_client.get(ANOTHER_GROUP_URL)
+        response = self.guest_client.get(INDEX_URL)
+        self.assertContains(
+            response, POST_TEXT_UPD,
+            msg_prefix='Новая запись должна сразу попадать на главную.')
+
+    def test_cache_group(self):
+        """Проверка кэширования страницы группы."""
+        html_0 = self.guest_client.get(GROUP_URL)
+        Post.objects.filter(pk=self.post_id).update(text=POST_TEXT_UPD)
+        html_1 = self.guest_client.get(GROUP_URL)
         self.assertHTMLEqual(
             str(html_0.content),
             str(html_1.content),
             'Проверьте работу cache страницы группы.')
 
-    def test_cache_follow_index(self):
-        """Проверка кэширования страницы подписок."""
-        html_0 = PostViewsTests.following_user.get(FOLLOW_INDEX_URL)
+    def test_cache_group_invalidated_by_new_post(self):
+        """Проверка сброса кэша страницы группы новой записью."""
+        self.guest_client.get(ANOTHER_GROUP_URL)
         Post.objects.create(
-            text=POST_TEXT,
-            author=PostViewsTests.author
+            text=POST_TEXT_UPD,
+            author=PostViewsTests.author,
+            group=PostViewsTests.another_group
         )
-        html_1 = PostViewsTests.following_user.get(FOLLOW_INDEX_URL)
+        response = self.guest_client.get(ANOTHER_GROUP_URL)
+        self.assertContains(
+            response, POST_TEXT_UPD,
+            msg_prefix='Новая запись должна сразу попадать в группу.')
+
+    def test_cache_follow_index(self):
+        """Проверка кэширования страницы подписок."""
+        following_user = PostViewsTests.following_user
+        html_0 = following_user.get(FOLLOW_INDEX_URL)
+        Post.objects.filter(pk=self.post_id).update(text=POST_TEXT_UPD)
+        html_1 = following_user.get(FOLLOW_INDEX_URL)
         self.assertHTMLEqual(
             str(html_0.content),
             str(html_1.content),
             'Проверьте работу cache страницы подписок.')
 
+    def test_cache_follow_index_not_shared(self):
+        """Проверка, что кэш страницы подписок не общий для
+        разных пользователей.
+        """
+        Post.objects.create(
+            text=ANOTHER_POST_TEXT,
+            author=PostViewsTests.another_author
+        )
+        Follow.objects.create(
+            user=self.user, author=PostViewsTests.another_author)
+        PostViewsTests.following_user.get(FOLLOW_INDEX_URL)
+        response = self.auth_client.get(FOLLOW_INDEX_URL)
+        self.assertContains(
+            response, ANOTHER_POST_TEXT,
+            msg_prefix='Проверьте страницу подписок.')
+        self.assertNotContains(
+            response, POST_TEXT,
+            msg_prefix='Страница подписок не должна быть общей.')
+
 
 class PaginatorTests(TestCase):
     @classmethod
@@ -419,8 +469,6 @@ class PaginatorTests(TestCase):
         cls.author = User.objects.create(username=AUTHOR_USERNAME)
         cls.user = User.objects.create(username=FOLLOWER_USERNAME)
 
-        Follow.objects.create(user=cls.user, author=cls.author)
-
         cls.following_user = Client()
         cls.following_user.force_login(cls.user)
 
@@ -456,7 +504,10 @@ class PaginatorTests(TestCase):
 
         Comment.objects.bulk_create(comments)
 
+        Follow.objects.create(user=cls.user, author=cls.author)
+
     def setUp(self):
+        cache.clear()
         self.post_id = PaginatorTests.post_for_comment.id
 
         self.POST_URL = reverse(
@@ -533,3 +584,456 @@ class PaginatorTests(TestCase):
             response.context.get('page').object_list), 3,
             'Количество комментариев на второй странице post'
             ' не совпадает с ожидаемым.')
+
+    def test_index_cursor_pages(self):
+        """Проверка курсорной пагинации index."""
+        first_page = self.guest_client.get(INDEX_URL).context.get('page')
+        self.assertFalse(
+            first_page.has_previous(),
+            'У первой страницы не должно быть предыдущей.')
+        response = self.guest_client.get(
+            INDEX_URL, {'after': first_page.next_cursor()})
+        second_page = response.context.get('page')
+        self.assertEqual(
+            len(second_page.object_list), 3,
+            'Количество постов на второй курсорной странице index'
+            ' не совпадает с ожидаемым.')
+        self.assertFalse(
+            second_page.has_next(),
+            'У последней страницы не должно быть следующей.')
+        response = self.guest_client.get(
+            INDEX_URL, {'before': second_page.previous_cursor()})
+        self.assertEqual(
+            list(response.context.get('page').object_list),
+            list(first_page.object_list),
+            'Курсор before должен возвращать на первую страницу.')
+
+    def test_cursor_pagination_ignores_broken_token(self):
+        """Проверка обработки некорректного курсора."""
+        response = self.guest_client.get(INDEX_URL, {'after': 'broken'})
+        self.assertEqual(len(
+            response.context.get('page').object_list), 10,
+            'Некорректный курсор должен открывать первую страницу.')
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create(username=AUTHOR_USERNAME)
+        cls.user = User.objects.create(username=FOLLOWER_USERNAME)
+
+        cls.following_user = Client()
+        cls.following_user.force_login(cls.user)
+
+        cls.old_post = Post.objects.create(
+            text=POST_TEXT,
+            author=cls.author,
+        )
+
+    def test_follow_backfills_timeline(self):
+        """Проверка заполнения ленты при подписке и очистки при отписке."""
+        follow = Follow.objects.create(
+            user=TimelineTests.user, author=TimelineTests.author)
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                user=TimelineTests.user,
+                post=TimelineTests.old_post).exists(),
+            'Проверьте заполнение ленты при подписке.')
+        follow.delete()
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=TimelineTests.user).exists(),
+            'Проверьте очистку ленты при отписке.')
+
+    def test_new_post_fans_out(self):
+        """Проверка раздачи новой записи в ленты подписчиков."""
+        Follow.objects.create(
+            user=TimelineTests.user, author=TimelineTests.author)
+        post = Post.objects.create(
+            text=POST_TEXT,
+            author=TimelineTests.author,
+        )
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                user=TimelineTests.user, post=post).exists(),
+            'Проверьте раздачу записи в ленты подписчиков.')
+
+    @override_settings(TIMELINE_SYNC_FANOUT_LIMIT=0)
+    def test_large_fan_out_deferred(self):
+        """Проверка отложенной раздачи записи многим подписчикам."""
+        Follow.objects.create(
+            user=TimelineTests.user, author=TimelineTests.author)
+        post = Post.objects.create(
+            text=POST_TEXT,
+            author=TimelineTests.author,
+        )
+        self.assertFalse(
+            TimelineEntry.objects.filter(post=post).exists(),
+            'Большая раздача должна выполняться в фоновой задаче.')
+        Worker().run_once()
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                user=TimelineTests.user, post=post).exists(),
+            'Проверьте раздачу записи фоновой задачей.')
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_pull_author_posts_in_follow_index(self):
+        """Проверка ленты для авторов с большим числом подписчиков."""
+        Follow.objects.create(
+            user=TimelineTests.user, author=TimelineTests.author)
+        post = Post.objects.create(
+            text=POST_TEXT,
+            author=TimelineTests.author,
+        )
+        self.assertFalse(
+            TimelineEntry.objects.exists(),
+            'Записи популярных авторов не должны раздаваться в ленты.')
+        response = TimelineTests.following_user.get(FOLLOW_INDEX_URL)
+        self.assertIn(
+            post, response.context.get('page').object_list,
+            'Проверьте ленту подписок для популярных авторов.')
+
+    @override_settings(TIMELINE_BACKFILL_LIMIT=1)
+    def test_rebuild_limits_posts_per_author(self):
+        """Проверка пересборки лент с лимитом записей на автора."""
+        Follow.objects.create(
+            user=TimelineTests.user, author=TimelineTests.author)
+        post = Post.objects.create(
+            text=POST_TEXT,
+            author=TimelineTests.author,
+        )
+        timeline.rebuild()
+        self.assertEqual(
+            list(TimelineEntry.objects.values_list('user', 'post')),
+            [(TimelineTests.user.pk, post.pk)],
+            'Пересборка должна брать только последние записи автора.')
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=2)
+    def test_follow_index_merges_push_and_pull(self):
+        """Проверка курсорных страниц ленты из записей push и pull."""
+        other = User.objects.create(username='TimelineOther')
+        for author in (TimelineTests.author, other):
+            Follow.objects.create(user=TimelineTests.user, author=author)
+        Profile.objects.filter(user=TimelineTests.author).update(
+            followers_count=5)
+        for number in range(12):
+            Post.objects.create(
+                text=f'{POST_TEXT} {number}',
+                author=(TimelineTests.author, other)[number % 2])
+        response = TimelineTests.following_user.get(FOLLOW_INDEX_URL)
+        first_page = response.context.get('page')
+        response = TimelineTests.following_user.get(
+            FOLLOW_INDEX_URL, {'after': first_page.next_cursor()})
+        second_page = response.context.get('page')
+        self.assertFalse(
+            second_page.has_next(),
+            'У последней страницы не должно быть следующей.')
+        self.assertEqual(
+            list(first_page) + list(second_page),
+            list(Post.objects.order_by('-pub_date', '-pk')),
+            'Лента должна сливать записи push и pull без повторов.')
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_author_back_to_push_backfills_followers(self):
+        """Проверка раздачи записей автора, вернувшегося на push."""
+        second = User.objects.create(username='TimelineSecond')
+        Follow.objects.create(
+            user=TimelineTests.user, author=TimelineTests.author)
+        follow = Follow.objects.create(
+            user=second, author=TimelineTests.author)
+        post = Post.objects.create(
+            text=POST_TEXT,
+            author=TimelineTests.author,
+        )
+        self.assertFalse(
+            TimelineEntry.objects.filter(post=post).exists(),
+            'Записи популярных авторов не должны раздаваться в ленты.')
+        follow.delete()
+        Worker().run_once()
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                user=TimelineTests.user, post=post).exists(),
+            'Записи автора, вернувшегося на push, должны попасть в ленты.')
+
+
+class FeedQueriesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create(username=AUTHOR_USERNAME)
+        cls.user = User.objects.create(username=FOLLOWER_USERNAME)
+
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+        cls.following_user = Client()
+        cls.following_user.force_login(cls.user)
+
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE,
+            slug=GROUP_SLUG,
+            description=GROUP_DESCRIPTION
+        )
+
+        for number in range(12):
+            post = Post.objects.create(
+                text=f'{POST_TEXT} {number}',
+                author=cls.author,
+                group=cls.group)
+            Comment.objects.create(
+                post=post, author=cls.user, text=COMMENT_TEXT)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feeds_query_count(self):
+        """Проверка фиксированного числа запросов в лентах."""
+        feeds = {
+            INDEX_URL: (self.guest_client, 1),
+            GROUP_URL: (self.guest_client, 2),
+            PROFILE_URL: (self.guest_client, 2),
+            FOLLOW_INDEX_URL: (FeedQueriesTests.following_user, 5),
+        }
+        for url, (client, queries) in feeds.items():
+            with self.subTest(url=url):
+                with self.assertNumQueries(queries):
+                    client.get(url)
+
+
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create(username=AUTHOR_USERNAME)
+
+        cls.auth_author = Client()
+        cls.auth_author.force_login(cls.author)
+
+        cls.post = Post.objects.create(
+            text=POST_TEXT,
+            author=cls.author,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_anonymous_conditional_get(self):
+        """Проверка ответа 304 на повторный запрос анонима."""
+        for url in (INDEX_URL, PROFILE_URL):
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertTrue(
+                    response.has_header('ETag'),
+                    'Проверьте заголовок ETag для анонимов.')
+                self.assertTrue(
+                    response.has_header('Last-Modified'),
+                    'Проверьте заголовок Last-Modified для анонимов.')
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(
+                    response.status_code, 304,
+                    'Повторный запрос с ETag должен получать 304.')
+
+    def test_anonymous_page_served_from_cache(self):
+        """Проверка отдачи страницы из кэша без рендеринга."""
+        self.guest_client.get(INDEX_URL)
+        response = self.guest_client.get(INDEX_URL)
+        self.assertIsNone(
+            response.context,
+            'Повторный запрос анонима не должен рендерить шаблон.')
+
+    def test_new_post_changes_etag(self):
+        """Проверка смены ETag после добавления записи."""
+        etag = self.guest_client.get(INDEX_URL)['ETag']
+        Post.objects.create(
+            text=POST_TEXT_UPD,
+            author=PageCacheTests.author,
+        )
+        response = self.guest_client.get(
+            INDEX_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(
+            response, POST_TEXT_UPD,
+            msg_prefix='Новая запись должна сбрасывать кэш страницы.')
+
+    def test_authenticated_user_bypasses_cache(self):
+        """Проверка обхода кэша страниц для авторизованных."""
+        response = PageCacheTests.auth_author.get(INDEX_URL)
+        self.assertFalse(
+            response.has_header('ETag'),
+            'Авторизованные пользователи не должны получать кэш страниц.')
+
+    def test_missing_page_keeps_version_store(self):
+        """Проверка, что 404 не создаёт счётчиков версий."""
+        key = posts_cache.version_key('author:NoSuchAuthor')
+        posts_cache.version_cache().delete(key)
+        url = reverse('profile', kwargs={'username': 'NoSuchAuthor'})
+        response = self.guest_client.get(url)
+        self.assertEqual(response.status_code, 404)
+        self.assertIsNone(
+            posts_cache.version_cache().get(key),
+            'Чтение версий не должно записывать счётчики.')
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create(username=AUTHOR_USERNAME)
+
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE,
+            slug=GROUP_SLUG,
+            description=GROUP_DESCRIPTION
+        )
+
+        cls.post = Post.objects.create(
+            text=POST_TEXT,
+            author=cls.author,
+            group=cls.group,
+        )
+        cls.another_post = Post.objects.create(
+            text=ANOTHER_POST_TEXT,
+            author=cls.author,
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def search(self, query):
+        response = self.guest_client.get(SEARCH_URL, {'q': query})
+        return response.context.get('page').object_list
+
+    def test_search_finds_posts(self):
+        """Проверка поиска по тексту записи и названию группы."""
+        queries = {
+            'тестовый': [SearchTests.post],
+            'ЗАПИСЬ автора': [SearchTests.another_post],
+            'группа': [SearchTests.post],
+            'тестовый автора': [],
+            '': [],
+        }
+        for query, expected in queries.items():
+            with self.subTest(query=query):
+                self.assertEqual(
+                    self.search(query), expected,
+                    'Проверьте результаты поиска.')
+
+    def test_search_index_follows_changes(self):
+        """Проверка обновления индекса при изменении записей и групп."""
+        post = Post.objects.get(pk=SearchTests.another_post.pk)
+        post.text = POST_TEXT_UPD
+        post.save()
+        self.assertEqual(
+            self.search('изменён'), [post],
+            'Индекс должен обновляться при изменении записи.')
+        group = Group.objects.get(pk=SearchTests.group.pk)
+        group.title = ANOTHER_GROUP_TITLE
+        group.save()
+        self.assertEqual(
+            self.search('другая'), [SearchTests.post],
+            'Индекс должен обновляться при изменении группы.')
+        Post.objects.filter(pk=SearchTests.post.pk).delete()
+        self.assertEqual(
+            self.search('другая'), [],
+            'Удалённые записи не должны находиться.')
+
+    def test_group_reindexed_only_on_title_change(self):
+        """Проверка переиндексации группы только при смене названия."""
+        group = Group.objects.get(pk=SearchTests.group.pk)
+        with mock.patch('posts.search.index_group') as index_group:
+            group.description = POST_TEXT_UPD
+            group.save()
+            index_group.assert_not_called()
+            group.title = ANOTHER_GROUP_TITLE
+            group.save()
+            index_group.assert_called_once_with(group)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.author = User.objects.create(username=AUTHOR_USERNAME)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.post = Post.objects.create(
+            text=POST_TEXT,
+            author=ThumbnailTests.author,
+            image=SimpleUploadedFile(
+                name='small.gif',
+                content=POST_IMAGE,
+                content_type='image/gif'
+            ),
+        )
+
+    def test_feed_uses_original_until_thumbnails_ready(self):
+        """Проверка ленты до подготовки миниатюр."""
+        self.assertIsNone(
+            thumbnails.card(self.post.image.name),
+            'Миниатюры не должны создаваться при чтении.')
+        response = self.guest_client.get(INDEX_URL)
+        self.assertContains(
+            response, self.post.image.url,
+            msg_prefix='До подготовки миниатюр показывается оригинал.')
+
+    def test_feed_uses_pregenerated_thumbnails(self):
+        """Проверка ленты с заранее подготовленными миниатюрами."""
+        self.assertEqual(
+            Worker().run_once(), 1,
+            'Сохранение записи должно ставить задачу для миниатюр.')
+        card = thumbnails.card(self.post.image.name)
+        self.assertEqual(
+            (card['width'], card['height']), (960, 339),
+            'Проверьте размер основной миниатюры.')
+        response = self.guest_client.get(INDEX_URL)
+        for url in (card['url'], card['webp_srcset']):
+            with self.subTest(url=url):
+                self.assertContains(
+                    response, url,
+                    msg_prefix='Лента должна показывать готовые миниатюры.')
+        self.assertIn(
+            '.webp', card['webp_srcset'],
+            'Проверьте WebP-вариант миниатюр.')
+
+    def test_feed_prefetches_thumbnails_in_one_lookup(self):
+        """Проверка одного обращения к хранилищу миниатюр на страницу."""
+        posts = [self.post] + [
+            Post.objects.create(
+                text=POST_TEXT,
+                author=ThumbnailTests.author,
+                image=SimpleUploadedFile(
+                    name=f'small{number}.gif',
+                    content=POST_IMAGE,
+                    content_type='image/gif'
+                ),
+            )
+            for number in range(2)
+        ]
+        Worker().run_once()
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.guest_client.get(INDEX_URL)
+        lookups = [query for query in queries.captured_queries
+                   if 'thumbnail_kvstore' in query['sql']]
+        self.assertEqual(
+            len(lookups), 1,
+            'Миниатюры страницы должны читаться одним запросом.')
+        for post in posts:
+            with self.subTest(post=post.pk):
+                self.assertContains(
+                    response, thumbnails.card(post.image.name)['url'],
+                    msg_prefix='Проверьте миниатюры на странице.')
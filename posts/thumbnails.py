@@ -0,0 +1,140 @@
+import time
+
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.kvstores.cached_db_kvstore import EMPTY_VALUE
+from sorl.thumbnail.models import KVStore
+
+from tasks.registry import task
+from yatube import metrics
+
+CARD_GEOMETRY = '960x339'
+CARD_OPTIONS = {'crop': 'center', 'upscale': True}
+RESPONSIVE_WIDTHS = (480, 960)
+WEBP = 'WEBP'
+
+
+def geometry(width):
+    card_width, card_height = map(int, CARD_GEOMETRY.split('x'))
+    return f'{width}x{round(width * card_height / card_width)}'
+
+
+def variants():
+    result = []
+    for width in RESPONSIVE_WIDTHS:
+        result.append((width, None, geometry(width)))
+        result.append((width, WEBP, geometry(width)))
+    return result
+
+
+def variant_options(image_format=None):
+    options = dict(CARD_OPTIONS)
+    if image_format:
+        options['format'] = image_format
+    return options
+
+
+def thumbnail_name(name, geometry_string, options):
+    """Имя миниатюры, которое sorl получит для тех же параметров."""
+    backend = default.backend
+    source = ImageFile(name)
+    options = dict(options)
+    if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(sorl_settings, attr)
+        if value != getattr(sorl_defaults, attr):
+            options.setdefault(key, value)
+    return backend._get_thumbnail_filename(source, geometry_string, options)
+
+
+def variant_keys(name):
+    keys = {}
+    for width, image_format, geometry_string in variants():
+        thumbnail = ImageFile(
+            thumbnail_name(
+                name, geometry_string, variant_options(image_format)),
+            default.storage)
+        keys[width, image_format] = add_prefix(thumbnail.key)
+    return keys
+
+
+def fetch(keys):
+    """Читает записи sorl одним get_many, промахи добирает одним запросом."""
+    kvstore = default.kvstore
+    if not hasattr(kvstore, 'cache'):
+        return {key: kvstore._get_raw(key) for key in keys}
+    values = kvstore.cache.get_many(keys)
+    missing = [key for key in keys if key not in values]
+    if missing:
+        stored = dict(KVStore.objects.filter(
+            key__in=missing).values_list('key', 'value'))
+        fresh = {key: stored.get(key, EMPTY_VALUE) for key in missing}
+        kvstore.cache.set_many(
+            fresh, sorl_settings.THUMBNAIL_CACHE_TIMEOUT)
+        values.update(fresh)
+    return {key: value for key, value in values.items()
+            if value is not None and value != EMPTY_VALUE}
+
+
+def prefetch(posts):
+    """Прикрепляет к записям готовые миниатюры карточки (card_thumbnail)."""
+    posts = [post for post in posts
+             if not hasattr(post, 'card_thumbnail')]
+    keys = {post.pk: variant_keys(post.image.name)
+            for post in posts if post.image}
+    values = fetch([key for post_keys in keys.values()
+                    for key in post_keys.values()])
+    for post in posts:
+        post.card_thumbnail = None
+        post_keys = keys.get(post.pk)
+        if post_keys and all(key in values for key in post_keys.values()):
+            post.card_thumbnail = build_card({
+                variant: deserialize_image_file(values[key])
+                for variant, key in post_keys.items()})
+    return posts
+
+
+def card(name):
+    """Готовые миниатюры карточки записи или None, если их ещё нет."""
+    keys = variant_keys(name)
+    values = fetch(list(keys.values()))
+    if not all(key in values for key in keys.values()):
+        return None
+    return build_card({variant: deserialize_image_file(values[key])
+                       for variant, key in keys.items()})
+
+
+def build_card(found):
+    main = found[RESPONSIVE_WIDTHS[-1], None]
+    return {
+        'url': main.url,
+        'width': main.width,
+        'height': main.height,
+        'srcset': ', '.join(
+            f'{found[width, None].url} {width}w'
+            for width in RESPONSIVE_WIDTHS),
+        'webp_srcset': ', '.join(
+            f'{found[width, WEBP].url} {width}w'
+            for width in RESPONSIVE_WIDTHS),
+    }
+
+
+@task(name='posts.generate_thumbnails', priority=5, unique=True)
+def generate(name):
+    started = time.perf_counter()
+    for width, image_format, geometry_string in variants():
+        get_thumbnail(
+            name, geometry_string, **variant_options(image_format))
+    metrics.THUMBNAIL_DURATION.observe(time.perf_counter() - started)
+    metrics.REGISTRY.maybe_flush()
+
+
+def schedule(post):
+    if post.image:
+        generate.delay(post.image.name)
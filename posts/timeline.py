@@ -0,0 +1,208 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Q
+
+from tasks.registry import task
+from . import cache
+from .models import Follow, Post, Profile, TimelineEntry
+from .pagination import CursorPaginator, keyset_filter
+
+BATCH_SIZE = 500
+
+
+def fanout_limit():
+    return getattr(settings, 'TIMELINE_FANOUT_LIMIT', 1000)
+
+
+def sync_fanout_limit():
+    return getattr(settings, 'TIMELINE_SYNC_FANOUT_LIMIT', 100)
+
+
+def backfill_limit():
+    return getattr(settings, 'TIMELINE_BACKFILL_LIMIT', 1000)
+
+
+def is_pull_author(author_id):
+    return Profile.objects.filter(
+        user_id=author_id, followers_count__gt=fanout_limit()).exists()
+
+
+def pull_authors(user):
+    return Follow.objects.filter(
+        user=user,
+        author__profile__followers_count__gt=fanout_limit()
+    ).values('author')
+
+
+def _insert(entries):
+    TimelineEntry.objects.bulk_create(
+        entries, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+def fan_out(post):
+    followers = Profile.objects.filter(
+        user_id=post.author_id).values_list(
+            'followers_count', flat=True).first() or 0
+    if followers > fanout_limit():
+        return
+    if followers > sync_fanout_limit():
+        fan_out_later.delay(post.pk)
+        return
+    _fan_out(post)
+
+
+def _fan_out(post):
+    followers = list(Follow.objects.filter(
+        author_id=post.author_id).values_list('user_id', flat=True))
+    _insert(
+        TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+        for user_id in followers
+    )
+    return followers
+
+
+@task(name='posts.fan_out', priority=5)
+def fan_out_later(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None:
+        followers = _fan_out(post)
+        cache.bump(*(f'follower:{user_id}' for user_id in followers))
+
+
+def _recent(author_id):
+    return list(Post.objects.filter(author_id=author_id).values_list(
+        'pk', 'pub_date')[:backfill_limit()])
+
+
+def _backfill(user_id, posts):
+    _insert(
+        TimelineEntry(user_id=user_id, post_id=pk, pub_date=pub_date)
+        for pk, pub_date in posts
+    )
+
+
+def backfill(user_id, author_id):
+    if author_id is None or is_pull_author(author_id):
+        return
+    _backfill(user_id, _recent(author_id))
+
+
+def follower_lost(author_id):
+    """Возвращает автора на push, когда подписчиков стало не больше
+    TIMELINE_FANOUT_LIMIT.
+
+    Пока автор был на pull, его записи не раздавались и подписки на него
+    не заполняли ленты, поэтому недавние записи раздаются всем
+    подписчикам фоновой задачей. Вызывается после уменьшения
+    followers_count; счётчик меняется на единицу, так что переход
+    случается ровно на значении лимита.
+    """
+    followers = Profile.objects.filter(
+        user_id=author_id).values_list('followers_count', flat=True).first()
+    if followers == fanout_limit():
+        backfill_followers.delay(author_id)
+
+
+@task(name='posts.backfill_followers', priority=5, unique=True)
+def backfill_followers(author_id):
+    if is_pull_author(author_id):
+        return
+    posts = _recent(author_id)
+    followers = list(Follow.objects.filter(
+        author_id=author_id).values_list('user_id', flat=True))
+    if posts:
+        for user_id in followers:
+            _backfill(user_id, posts)
+    cache.bump(*(f'follower:{user_id}' for user_id in followers))
+
+
+def prune(user_id, author_id):
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id).delete()
+
+
+def rebuild():
+    """Заполняет ленты заново, как при подписке: каждому подписчику
+    попадает не больше backfill_limit() последних записей каждого
+    push-автора."""
+    TimelineEntry.objects.all().delete()
+    entries, follows, profiles, posts = (
+        connection.ops.quote_name(model._meta.db_table)
+        for model in (TimelineEntry, Follow, Profile, Post))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {entries} (user_id, post_id, pub_date) '
+            'SELECT user_id, post_id, pub_date FROM ('
+            'SELECT f.user_id, p.id AS post_id, p.pub_date, ROW_NUMBER() '
+            'OVER (PARTITION BY f.user_id, f.author_id '
+            'ORDER BY p.pub_date DESC, p.id DESC) AS place '
+            f'FROM {follows} f '
+            f'JOIN {profiles} a ON a.user_id = f.author_id '
+            f'JOIN {posts} p ON p.author_id = f.author_id '
+            'WHERE a.followers_count <= %s) ranked '
+            'WHERE place <= %s', [fanout_limit(), backfill_limit()])
+
+
+class Timeline:
+    """Лента подписок пользователя.
+
+    Записи раздаваемых авторов читаются из TimelineEntry по индексу
+    (user, -pub_date), записи pull-авторов — из Post по (author, -pub_date).
+    Каждый источник отдаёт не больше нужного числа ключей после курсора,
+    ключи сливаются в Python, и загружаются только записи страницы.
+    """
+    model = Post
+    ordered = True
+
+    def __init__(self, user):
+        self.user = user
+
+    def pushed(self, cursor=None, newer=False):
+        queryset = TimelineEntry.objects.filter(user=self.user)
+        if cursor is not None:
+            queryset = keyset_filter(
+                queryset, 'pub_date', cursor, newer, 'post_id')
+        ordering = ('pub_date', 'post_id') if newer else (
+            '-pub_date', '-post_id')
+        return queryset.order_by(*ordering).values_list('post_id', 'pub_date')
+
+    def pulled(self, cursor=None, newer=False):
+        queryset = Post.objects.filter(author__in=pull_authors(self.user))
+        if cursor is not None:
+            queryset = keyset_filter(queryset, 'pub_date', cursor, newer)
+        ordering = ('pub_date', 'pk') if newer else ('-pub_date', '-pk')
+        return queryset.order_by(*ordering).values_list('pk', 'pub_date')
+
+    def keys(self, cursor, newer, limit):
+        # Записи автора, ушедшего на pull, остаются и в TimelineEntry:
+        # повторы убираются множеством до среза.
+        keys = set(self.pushed(cursor, newer)[:limit])
+        keys.update(self.pulled(cursor, newer)[:limit])
+        return sorted(
+            keys, key=lambda key: (key[1], key[0]), reverse=not newer
+        )[:limit]
+
+    def fetch(self, keys):
+        posts = Post.objects.feed().in_bulk([pk for pk, _ in keys])
+        return [posts[pk] for pk, _ in keys if pk in posts]
+
+    def rows(self, cursor, newer, limit):
+        return self.fetch(self.keys(cursor, newer, limit))
+
+    def count(self):
+        entries = TimelineEntry.objects.filter(user=self.user).aggregate(
+            total=Count('pk'),
+            pulled=Count('pk', filter=Q(
+                post__author__in=pull_authors(self.user))))
+        return (entries['total'] - entries['pulled']
+                + self.pulled().count())
+
+    def __getitem__(self, index):
+        return self.fetch(self.keys(None, False, index.stop)[index.start:])
+
+
+class TimelinePaginator(CursorPaginator):
+    """Курсорная пагинация ленты подписок через Timeline.rows()."""
+
+    def rows(self, cursor, newer, limit):
+        return self.object_list.rows(cursor, newer, limit)
@@ -1,35 +1,85 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.http import urlencode
 
+from .cache import cache_anonymous_page, fragment_version
 from .forms import CommentForm, PostForm
 from .models import Comment, Follow, Group, Post, User
-
-
-def pagination(objects_list, items, request):
+from .pagination import CursorPaginator
+from .search import search as search_posts
+from .timeline import Timeline, TimelinePaginator
+
+
+def pagination(objects_list, items, request,
+               cursor_paginator=CursorPaginator):
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    cursor_mode = (
+        after or before
+        or (getattr(settings, 'PAGINATION_MODE', 'page') == 'cursor'
+            and 'page' not in request.GET)
+    )
+    if cursor_mode:
+        field = objects_list.model._meta.ordering[0].lstrip('-')
+        paginator = cursor_paginator(objects_list, items, field)
+        page = paginator.get_page(after=after, before=before)
+        return page, paginator
     paginator = Paginator(objects_list, items)
     page_number = request.GET.get('page')
     page = paginator.get_page(page_number)
     return page, paginator
 
 
+def index_validators():
+    return ['posts']
+
+
+def group_validators(slug):
+    return ['posts', f'group:{slug}']
+
+
+def profile_validators(username):
+    return [f'author:{username}']
+
+
+@cache_anonymous_page(index_validators)
 def index(request):
-    post_list = Post.objects.select_related('group')
+    post_list = Post.objects.feed()
     page, paginator = pagination(post_list, 10, request)
     return render(
         request, 'index.html',
-        {'page': page, 'paginator': paginator}
+        {'page': page, 'paginator': paginator,
+         'cache_version': fragment_version(request, 'posts')}
     )
 
 
+@cache_anonymous_page(group_validators)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
+    post_list = group.posts.feed()
     page, paginator = pagination(post_list, 10, request)
     return render(
         request, 'group.html',
         {'page': page, 'paginator': paginator,
-         'group': group}
+         'group': group,
+         'cache_version': fragment_version(
+             request, 'posts', f'group:{group.slug}')}
+    )
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    paginator = Paginator(search_posts(query) if query else [], 10)
+    page = paginator.get_page(request.GET.get('page'))
+    posts = Post.objects.feed().in_bulk(page.object_list)
+    page.object_list = [
+        posts[pk] for pk in page.object_list if pk in posts]
+    return render(
+        request, 'posts/search.html',
+        {'page': page, 'paginator': paginator, 'query': query,
+         'query_string': urlencode({'q': query}) + '&'}
     )
 
 
@@ -48,9 +98,11 @@ def new_post(request):
     )
 
 
+@cache_anonymous_page(profile_validators)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
+    author = get_object_or_404(
+        User.objects.select_related('profile'), username=username)
+    post_list = author.posts.feed()
     page, paginator = pagination(post_list, 5, request)
     if request.user.is_authenticated:
         following = Follow.objects.filter(
@@ -68,7 +120,9 @@ def profile(request, username):
 
 
 def post_view(request, username, post_id):
-    post = get_object_or_404(Post, author__username=username, id=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__profile'),
+        author__username=username, id=post_id)
     author = post.author
     comments = post.comments.all()
     page, paginator = pagination(comments, 5, request)
@@ -133,11 +187,13 @@ def delete_comment(request, username, post_id, comment_id):
 
 @login_required
 def follow_index(request):
-    post_list = Post.objects.filter(author__following__user=request.user)
-    page, paginator = pagination(post_list, 10, request)
+    page, paginator = pagination(
+        Timeline(request.user), 10, request, TimelinePaginator)
     return render(
         request, 'follow.html',
-        {'page': page, 'paginator': paginator}
+        {'page': page, 'paginator': paginator,
+         'cache_version': fragment_version(
+             request, 'posts', f'follower:{request.user.pk}')}
     )
 
 
@@ -0,0 +1,67 @@
+import base64
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .registry import task
+
+FIELDS = (
+    'subject', 'body', 'from_email', 'to', 'cc', 'bcc', 'reply_to',
+    'extra_headers', 'content_subtype',
+)
+
+
+def delivery_backend():
+    return getattr(
+        settings, 'TASKS_EMAIL_BACKEND',
+        'django.core.mail.backends.smtp.EmailBackend')
+
+
+def serialize(message):
+    data = {field: getattr(message, field) for field in FIELDS}
+    data['alternatives'] = list(getattr(message, 'alternatives', []))
+    data['attachments'] = []
+    for filename, content, mimetype in message.attachments:
+        if isinstance(content, str):
+            content = content.encode()
+        data['attachments'].append(
+            (filename, base64.b64encode(content).decode(), mimetype))
+    return data
+
+
+def deserialize(data):
+    message = EmailMultiAlternatives(
+        headers=data['extra_headers'],
+        alternatives=[tuple(item) for item in data['alternatives']],
+        **{field: data[field] for field in FIELDS
+           if field not in ('extra_headers', 'content_subtype')})
+    message.content_subtype = data['content_subtype']
+    for filename, content, mimetype in data['attachments']:
+        message.attach(filename, base64.b64decode(content), mimetype)
+    return message
+
+
+@task(name='tasks.send_email', priority=10, max_attempts=5)
+def send_email(data):
+    connection = get_connection(delivery_backend())
+    connection.send_messages([deserialize(data)])
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Отправляет письма через очередь задач, а не в запросе.
+
+    Письма с MIME-вложениями не сериализуются и уходят сразу.
+    """
+
+    def send_messages(self, email_messages):
+        sent = 0
+        for message in email_messages:
+            if any(not isinstance(attachment, tuple)
+                   for attachment in message.attachments):
+                sent += get_connection(
+                    delivery_backend()).send_messages([message])
+                continue
+            send_email.delay(serialize(message))
+            sent += 1
+        return sent
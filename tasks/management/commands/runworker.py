@@ -0,0 +1,38 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from tasks.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Число потоков-обработчиков.')
+        parser.add_argument(
+            '--poll-interval', type=float, default=1,
+            help='Пауза между опросами пустой очереди, секунд.')
+        parser.add_argument(
+            '--timeout', type=int,
+            help='Время, на которое задача скрывается от других '
+                 'обработчиков, секунд.')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить доступные задачи и завершиться.')
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            workers=options['workers'],
+            poll_interval=options['poll_interval'],
+            timeout=options['timeout'])
+        if options['once']:
+            done = worker.run_once()
+            self.stdout.write(f'Выполнено задач: {done}')
+            return
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: worker.stop())
+        self.stdout.write(f'Обработчик {worker.name} запущен.')
+        worker.run()
@@ -0,0 +1,48 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = [
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    ]
+
+    name = models.CharField(
+        verbose_name='Задача', max_length=200)
+    payload = models.TextField(
+        verbose_name='Аргументы', default='{}')
+    priority = models.SmallIntegerField(
+        verbose_name='Приоритет', default=0)
+    status = models.CharField(
+        verbose_name='Состояние', max_length=10,
+        choices=STATUSES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name='Максимум попыток', default=3)
+    run_at = models.DateTimeField(
+        verbose_name='Запустить после', default=timezone.now)
+    locked_until = models.DateTimeField(
+        verbose_name='Занята до', blank=True, null=True)
+    locked_by = models.CharField(
+        verbose_name='Обработчик', max_length=100, blank=True)
+    last_error = models.TextField(
+        verbose_name='Последняя ошибка', blank=True)
+    created = models.DateTimeField(
+        verbose_name='Дата создания', auto_now_add=True)
+
+    class Meta:
+        ordering = ['-priority', 'run_at', 'pk']
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        indexes = [
+            models.Index(fields=['status', '-priority', 'run_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
@@ -0,0 +1,59 @@
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import Task
+
+registry = {}
+
+
+def dumps(args, kwargs):
+    return json.dumps(
+        {'args': list(args), 'kwargs': kwargs},
+        cls=DjangoJSONEncoder, sort_keys=True)
+
+
+def enqueue(name, args=(), kwargs=None, priority=0, max_attempts=3,
+            countdown=0, unique=False):
+    """Ставит задачу в очередь в текущей транзакции.
+
+    При unique=True задача не дублируется, пока такая же (с теми же
+    аргументами) ждёт в очереди. При TASKS_EAGER функция выполняется
+    сразу.
+    """
+    kwargs = kwargs or {}
+    if getattr(settings, 'TASKS_EAGER', False):
+        registry[name](*args, **kwargs)
+        return None
+    payload = dumps(args, kwargs)
+    if unique:
+        queued = Task.objects.filter(
+            name=name, payload=payload, status=Task.QUEUED).first()
+        if queued is not None:
+            return queued
+    return Task.objects.create(
+        name=name, payload=payload, priority=priority,
+        max_attempts=max_attempts,
+        run_at=timezone.now() + timedelta(seconds=countdown))
+
+
+def task(name=None, priority=0, max_attempts=3, unique=False):
+    """Регистрирует функцию как задачу и добавляет ей метод delay()."""
+
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        registry[task_name] = func
+
+        def delay(*args, **kwargs):
+            return enqueue(
+                task_name, args, kwargs, priority=priority,
+                max_attempts=max_attempts, unique=unique)
+
+        func.task_name = task_name
+        func.delay = delay
+        return func
+
+    return decorator
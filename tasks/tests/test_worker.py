@@ -0,0 +1,124 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.registry import enqueue, task
+from tasks.worker import Worker
+
+CALLS = []
+
+
+@task(name='tests.record')
+def record(value):
+    CALLS.append(value)
+
+
+@task(name='tests.flaky', max_attempts=2)
+def flaky():
+    raise ValueError('Ошибка задачи')
+
+
+@task(name='tests.unique', unique=True)
+def unique(value):
+    CALLS.append(value)
+
+
+@override_settings(TASKS_EAGER=False, TASKS_RETRY_DELAY=10)
+class WorkerTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+        self.worker = Worker(name='test-worker')
+
+    def test_tasks_run_by_priority(self):
+        """Проверка выполнения задач по приоритету."""
+        record.delay('low')
+        enqueue('tests.record', ['high'], priority=10)
+        self.assertEqual(self.worker.run_once(), 2)
+        self.assertEqual(
+            CALLS, ['high', 'low'],
+            'Задачи с большим приоритетом должны выполняться раньше.')
+        self.assertFalse(
+            Task.objects.exists(),
+            'Выполненные задачи должны удаляться из очереди.')
+
+    def test_run_once_drains_queue(self):
+        """Проверка выполнения всей очереди за один проход."""
+        for number in range(5):
+            record.delay(number)
+        self.assertEqual(
+            self.worker.run_once(limit=2), 5,
+            'run_once должен забирать пачки, пока очередь не опустеет.')
+
+    def test_failed_task_retried_with_backoff(self):
+        """Проверка повторов упавшей задачи."""
+        flaky.delay()
+        self.worker.run_once()
+        queued = Task.objects.get()
+        self.assertEqual(
+            (queued.status, queued.attempts), (Task.QUEUED, 1),
+            'Упавшая задача должна вернуться в очередь.')
+        self.assertGreater(
+            queued.run_at, timezone.now() + timedelta(seconds=5),
+            'Повтор должен откладываться.')
+        self.assertIn('Ошибка задачи', queued.last_error)
+        Task.objects.update(run_at=timezone.now())
+        self.worker.run_once()
+        self.assertEqual(
+            Task.objects.get().status, Task.FAILED,
+            'После последней попытки задача должна помечаться ошибкой.')
+
+    def test_visibility_timeout(self):
+        """Проверка возврата зависшей задачи в работу."""
+        record.delay('again')
+        claimed = self.worker.claim(1)
+        self.assertEqual(
+            Worker(name='another-worker').claim(1), [],
+            'Захваченная задача не должна выдаваться другим.')
+        Task.objects.filter(pk=claimed[0].pk).update(
+            locked_until=timezone.now() - timedelta(seconds=1))
+        another = Worker(name='another-worker')
+        self.assertEqual(another.run_once(), 1)
+        self.assertEqual(
+            CALLS, ['again'],
+            'Задачу с истёкшим таймаутом должен забрать другой обработчик.')
+
+    def test_unique_tasks(self):
+        """Проверка отсутствия дублей уникальных задач в очереди."""
+        unique.delay('once')
+        unique.delay('once')
+        unique.delay('twice')
+        self.assertEqual(Task.objects.count(), 2)
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_mode(self):
+        """Проверка немедленного выполнения при TASKS_EAGER."""
+        record.delay('now')
+        self.assertEqual(CALLS, ['now'])
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(
+        EMAIL_BACKEND='tasks.mail.QueuedEmailBackend',
+        TASKS_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_queued_email(self):
+        """Проверка отправки писем через очередь."""
+        message = mail.EmailMultiAlternatives(
+            'Тема', 'Текст', 'from@example.com', ['to@example.com'])
+        message.attach_alternative('<p>Текст</p>', 'text/html')
+        message.attach('note.txt', 'Вложение', 'text/plain')
+        message.send()
+        self.assertEqual(
+            len(mail.outbox), 0,
+            'Письмо не должно отправляться в запросе.')
+        call_command('runworker', once=True, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        sent = mail.outbox[0]
+        self.assertEqual(
+            (sent.subject, sent.to, sent.alternatives[0][0]),
+            ('Тема', ['to@example.com'], '<p>Текст</p>'),
+            'Проверьте письмо, отправленное из очереди.')
+        self.assertEqual(sent.attachments[0][0], 'note.txt')
@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import socket
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+from .registry import registry
+
+logger = logging.getLogger(__name__)
+
+
+def visibility_timeout():
+    return getattr(settings, 'TASKS_VISIBILITY_TIMEOUT', 300)
+
+
+def retry_delay():
+    return getattr(settings, 'TASKS_RETRY_DELAY', 10)
+
+
+def available(now):
+    return (
+        Q(status=Task.QUEUED, run_at__lte=now)
+        | Q(status=Task.RUNNING, locked_until__lt=now)
+    )
+
+
+class Worker:
+    """Забирает задачи из таблицы Task и выполняет их в пуле потоков.
+
+    Задача захватывается условным UPDATE, поэтому несколько процессов
+    могут работать с одной очередью без блокировок строк. Если обработчик
+    не завершил задачу за visibility_timeout секунд, её заберёт другой.
+    """
+
+    def __init__(self, workers=1, poll_interval=1, timeout=None,
+                 name=None):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.timeout = timeout or visibility_timeout()
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = threading.Event()
+
+    def claim(self, limit):
+        now = timezone.now()
+        candidates = Task.objects.filter(available(now)).values_list(
+            'pk', flat=True)[:limit * 2]
+        claimed = []
+        for pk in list(candidates):
+            updated = Task.objects.filter(available(now), pk=pk).update(
+                status=Task.RUNNING,
+                locked_until=now + timedelta(seconds=self.timeout),
+                locked_by=self.name,
+                attempts=F('attempts') + 1)
+            if updated:
+                claimed.append(Task.objects.get(pk=pk))
+            if len(claimed) >= limit:
+                break
+        return claimed
+
+    def execute(self, task):
+        func = registry.get(task.name)
+        try:
+            if func is None:
+                raise LookupError(f'Неизвестная задача {task.name}')
+            if task.attempts > task.max_attempts:
+                raise TimeoutError('Превышено время выполнения задачи')
+            payload = json.loads(task.payload)
+            func(*payload['args'], **payload['kwargs'])
+        except Exception:
+            self.fail(task, traceback.format_exc())
+            return False
+        Task.objects.filter(pk=task.pk, locked_by=self.name).delete()
+        return True
+
+    def fail(self, task, error):
+        logger.warning('Задача %s завершилась с ошибкой:\n%s', task, error)
+        retry = task.attempts < task.max_attempts and task.name in registry
+        delay = retry_delay() * 2 ** (task.attempts - 1)
+        Task.objects.filter(pk=task.pk, locked_by=self.name).update(
+            status=Task.QUEUED if retry else Task.FAILED,
+            run_at=timezone.now() + timedelta(seconds=delay),
+            locked_until=None,
+            last_error=error)
+
+    def run_once(self, limit=100):
+        """Выполняет в текущем потоке задачи, пока очередь не опустеет.
+
+        Задачи забираются пачками по limit; отложенные повторы с run_at
+        в будущем в этот проход не попадают.
+        """
+        done = 0
+        while True:
+            tasks = self.claim(limit)
+            if not tasks:
+                return done
+            for task in tasks:
+                self.execute(task)
+                done += 1
+
+    def _execute_in_thread(self, task):
+        close_old_connections()
+        try:
+            return self.execute(task)
+        finally:
+            connections.close_all()
+
+    def run(self):
+        running = set()
+        with ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix='tasks') as pool:
+            while not self.stopping.is_set():
+                running = {future for future in running
+                           if not future.done()}
+                free = self.workers - len(running)
+                tasks = self.claim(free) if free else []
+                for task in tasks:
+                    running.add(pool.submit(self._execute_in_thread, task))
+                if not tasks:
+                    self.stopping.wait(self.poll_interval)
+
+    def stop(self):
+        self.stopping.set()
@@ -0,0 +1,18 @@
+from django.apps import AppConfig
+
+
+class YatubeConfig(AppConfig):
+    name = 'yatube'
+    verbose_name = 'Yatube'
+
+    def ready(self):
+        from django.core.signals import request_started
+        from django.db.backends.signals import connection_created
+
+        from . import checks  # noqa
+        from .db import check_connections, configure_sqlite
+        from .slow_queries import install
+
+        connection_created.connect(configure_sqlite)
+        connection_created.connect(install)
+        request_started.connect(check_connections)
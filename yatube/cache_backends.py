@@ -0,0 +1,229 @@
+import fcntl
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+
+from .metrics import FRAGMENT_CACHE
+from .timing import record_cache
+
+EPOCH_KEY = 'tiered-cache:epoch'
+FRAGMENT_PREFIX = 'template.cache.'
+
+
+class TieredCache(BaseCache):
+    """Небольшой LRU-кэш потока (L1) перед общим бэкендом (L2).
+
+    Обработчик caches в Django хранит бэкенды в threading.local, поэтому
+    у каждого потока свой экземпляр и свой L1. Записи L1 живут не
+    дольше L1_TIMEOUT секунд. Удаления и очистка увеличивают эпоху в
+    L2; другие потоки и процессы сверяют её не чаще раза в
+    EPOCH_INTERVAL секунд и сбрасывают свой L1. Ключи с префиксами из
+    L1_BYPASS_PREFIXES всегда читаются из L2.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._l2_alias = options.get('L2', location)
+        self._l1_max_entries = options.get('L1_MAX_ENTRIES', 1000)
+        self._l1_timeout = options.get('L1_TIMEOUT', 5)
+        self._epoch_interval = options.get('EPOCH_INTERVAL', 1)
+        self._bypass = tuple(options.get('L1_BYPASS_PREFIXES', ()))
+        self._l1 = OrderedDict()
+        self._lock = threading.Lock()
+        self._epoch = None
+        self._epoch_checked = 0
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    def _cacheable(self, key):
+        return not key.startswith(self._bypass)
+
+    def _sync_epoch(self):
+        now = time.monotonic()
+        if now - self._epoch_checked < self._epoch_interval:
+            return
+        self._epoch_checked = now
+        epoch = self.l2.get(EPOCH_KEY)
+        if epoch != self._epoch:
+            with self._lock:
+                self._l1.clear()
+            self._epoch = epoch
+
+    def _broadcast(self):
+        try:
+            self._epoch = self.l2.incr(EPOCH_KEY)
+        except ValueError:
+            self._epoch = int(time.time() * 1000)
+            self.l2.set(EPOCH_KEY, self._epoch, None)
+
+    def _l1_get(self, key, version):
+        entry_key = (key, version)
+        with self._lock:
+            entry = self._l1.get(entry_key)
+            if entry is None:
+                return False, None
+            expires, pickled = entry
+            if expires < time.monotonic():
+                del self._l1[entry_key]
+                return False, None
+            self._l1.move_to_end(entry_key)
+        return True, pickle.loads(pickled)
+
+    def _l1_set(self, key, value, version, timeout=DEFAULT_TIMEOUT):
+        if not self._cacheable(key):
+            return
+        ttl = self._l1_timeout
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            ttl = min(ttl, timeout)
+        if ttl <= 0:
+            self._l1_delete(key, version)
+            return
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._l1[(key, version)] = (time.monotonic() + ttl, pickled)
+            self._l1.move_to_end((key, version))
+            while len(self._l1) > self._l1_max_entries:
+                self._l1.popitem(last=False)
+
+    def _l1_delete(self, key, version):
+        with self._lock:
+            self._l1.pop((key, version), None)
+
+    def _record(self, key, hit):
+        record_cache(int(hit), int(not hit))
+        if key.startswith(FRAGMENT_PREFIX):
+            FRAGMENT_CACHE.inc('hit' if hit else 'miss')
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.l2.add(key, value, timeout, version)
+        if added:
+            self._l1_set(key, value, version, timeout)
+        return added
+
+    def get(self, key, default=None, version=None):
+        self._sync_epoch()
+        if self._cacheable(key):
+            found, value = self._l1_get(key, version)
+            if found:
+                self._record(key, True)
+                return value
+        sentinel = object()
+        value = self.l2.get(key, sentinel, version)
+        if value is sentinel:
+            self._record(key, False)
+            return default
+        self._record(key, True)
+        self._l1_set(key, value, version)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l2.set(key, value, timeout, version)
+        self._l1_set(key, value, version, timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.l2.touch(key, timeout, version)
+
+    def delete(self, key, version=None):
+        self._l1_delete(key, version)
+        self.l2.delete(key, version)
+        self._broadcast()
+
+    def get_many(self, keys, version=None):
+        self._sync_epoch()
+        keys = list(keys)
+        found = {}
+        missing = []
+        for key in keys:
+            hit, value = (
+                self._l1_get(key, version) if self._cacheable(key)
+                else (False, None))
+            if hit:
+                found[key] = value
+            else:
+                missing.append(key)
+        if missing:
+            fetched = self.l2.get_many(missing, version)
+            for key, value in fetched.items():
+                self._l1_set(key, value, version)
+            found.update(fetched)
+        record_cache(len(found), len(keys) - len(found))
+        return found
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.l2.set_many(data, timeout, version)
+        for key, value in data.items():
+            if key not in failed:
+                self._l1_set(key, value, version, timeout)
+        return failed
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        for key in keys:
+            self._l1_delete(key, version)
+        self.l2.delete_many(keys, version)
+        self._broadcast()
+
+    def has_key(self, key, version=None):
+        if self._cacheable(key) and self._l1_get(key, version)[0]:
+            return True
+        return self.l2.has_key(key, version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.l2.incr(key, delta, version)
+        self._l1_delete(key, version)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._l1.clear()
+        self.l2.clear()
+        self._broadcast()
+
+    def close(self, **kwargs):
+        self.l2.close(**kwargs)
+
+
+class CounterFileCache(FileBasedCache):
+    """Файловый кэш с атомарными add, incr и advance для счётчиков версий.
+
+    FileBasedCache.incr читает и записывает значение без блокировки, и
+    одновременные увеличения из разных процессов теряются. Здесь
+    операции над счётчиками выполняются под fcntl.flock.
+    """
+
+    @contextmanager
+    def _locked(self):
+        self._createdir()
+        with open(os.path.join(self._dir, 'counters.lock'), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._locked():
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        with self._locked():
+            return super().incr(key, delta, version)
+
+    def advance(self, key, value, version=None):
+        """Ставит max(текущее + 1, value) и возвращает новое значение."""
+        with self._locked():
+            current = self.get(key, version=version)
+            if current is not None:
+                value = max(current + 1, value)
+            self.set(key, value, None, version)
+            return value
@@ -0,0 +1,58 @@
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import (ManifestFilesMixin,
+                                                staticfiles_storage)
+from django.core.checks import Error, register
+from django.template.utils import get_app_template_dirs
+
+STATIC_TAG = re.compile(r'''{%\s*static\s+(['"])([^'"]+)\1''')
+
+
+def template_dirs():
+    dirs = []
+    for engine in settings.TEMPLATES:
+        dirs.extend(engine.get('DIRS', []))
+    dirs.extend(get_app_template_dirs('templates'))
+    return dirs
+
+
+def static_references():
+    for directory in template_dirs():
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if not filename.endswith(('.html', '.txt', '.xml')):
+                    continue
+                path = os.path.join(root, filename)
+                with open(path, encoding='utf-8') as file:
+                    content = file.read()
+                for match in STATIC_TAG.finditer(content):
+                    yield path, match.group(2)
+
+
+@register('staticfiles', deploy=True)
+def check_static_references(app_configs, **kwargs):
+    if isinstance(staticfiles_storage, ManifestFilesMixin):
+        manifest = staticfiles_storage.load_manifest()
+        if not manifest:
+            return [Error(
+                'Манифест статических файлов пуст или не найден.',
+                hint='Выполните manage.py collectstatic.',
+                id='yatube.E002',
+            )]
+        exists = manifest.__contains__
+    else:
+        exists = finders.find
+    return [
+        Error(
+            f'Шаблон ссылается на отсутствующий статический файл {name}.',
+            hint='Добавьте файл в STATICFILES_DIRS и выполните '
+                 'collectstatic или исправьте ссылку.',
+            obj=path,
+            id='yatube.E001',
+        )
+        for path, name in static_references()
+        if not exists(name)
+    ]
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.db import connections
+
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -20000,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+
+def sqlite_pragmas():
+    return getattr(settings, 'SQLITE_PRAGMAS', DEFAULT_SQLITE_PRAGMAS)
+
+
+def apply_pragmas(cursor, pragmas):
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            apply_pragmas(cursor, sqlite_pragmas())
+
+
+def check_connections(**kwargs):
+    """Закрывает постоянные соединения, которые перестали отвечать.
+
+    Аналог CONN_HEALTH_CHECKS из новых версий Django: проверка идёт в
+    начале запроса, только для уже открытых соединений.
+    """
+    for connection in connections.all():
+        if (connection.connection is None
+                or not connection.settings_dict.get('CONN_HEALTH_CHECKS')
+                or connection.in_atomic_block):
+            continue
+        if not connection.is_usable():
+            connection.close()
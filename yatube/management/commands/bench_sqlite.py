@@ -0,0 +1,129 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from yatube.db import apply_pragmas, sqlite_pragmas
+
+SCHEMA = (
+    'CREATE TABLE comment ('
+    'id INTEGER PRIMARY KEY, post_id INTEGER NOT NULL, '
+    'text TEXT NOT NULL, created REAL NOT NULL)',
+    'CREATE INDEX comment_post ON comment (post_id, created)',
+)
+
+
+class Profile:
+    def __init__(self, name, pragmas, persistent, begin):
+        self.name = name
+        self.pragmas = pragmas
+        self.persistent = persistent
+        self.begin = begin
+
+    def connect(self, path):
+        connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False)
+        apply_pragmas(connection.cursor(), self.pragmas)
+        return connection
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает конкурентную запись и чтение SQLite с настройками '
+            'по умолчанию и с SQLITE_PRAGMAS и постоянными соединениями.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=3)
+        parser.add_argument('--rows', type=int, default=20000)
+
+    def prepare(self, path, profile, rows):
+        connection = profile.connect(path)
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.execute('BEGIN')
+        connection.executemany(
+            'INSERT INTO comment (post_id, text, created) VALUES (?, ?, ?)',
+            ((number % 100, f'Комментарий {number}', number)
+             for number in range(rows)))
+        connection.execute('COMMIT')
+        connection.close()
+
+    def write(self, connection, number, profile):
+        connection.execute(profile.begin)
+        try:
+            connection.execute(
+                'SELECT COUNT(*) FROM comment WHERE post_id = ?',
+                (number % 100,)).fetchone()
+            connection.execute(
+                'INSERT INTO comment (post_id, text, created) '
+                'VALUES (?, ?, ?)',
+                (number % 100, 'Новый комментарий', time.time()))
+            connection.execute('COMMIT')
+        except sqlite3.OperationalError:
+            connection.execute('ROLLBACK')
+            raise
+
+    def read(self, connection, number, profile):
+        connection.execute(
+            'SELECT id, text FROM comment WHERE post_id = ? '
+            'ORDER BY created DESC LIMIT 10', (number % 100,)).fetchall()
+
+    def worker(self, path, profile, operation, deadline, totals):
+        done = errors = 0
+        connection = profile.connect(path) if profile.persistent else None
+        while time.perf_counter() < deadline:
+            current = connection or profile.connect(path)
+            try:
+                operation(current, done, profile)
+                done += 1
+            except sqlite3.OperationalError:
+                errors += 1
+            finally:
+                if connection is None:
+                    current.close()
+        if connection is not None:
+            connection.close()
+        totals.append((operation.__name__, done, errors))
+
+    def run(self, profile, options):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.sqlite3')
+            self.prepare(path, profile, options['rows'])
+            totals = []
+            deadline = time.perf_counter() + options['seconds']
+            threads = [
+                threading.Thread(
+                    target=self.worker,
+                    args=(path, profile, operation, deadline, totals))
+                for operation, count in (
+                    (self.write, options['writers']),
+                    (self.read, options['readers']))
+                for _ in range(count)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        result = {'write': [0, 0], 'read': [0, 0]}
+        for name, done, errors in totals:
+            result[name][0] += done
+            result[name][1] += errors
+        seconds = options['seconds']
+        self.stdout.write(
+            f'{profile.name:<10} '
+            f'{result["write"][0] / seconds:>10.0f} writes/sec '
+            f'{result["read"][0] / seconds:>10.0f} reads/sec '
+            f'{result["write"][1] + result["read"][1]:>6} locked')
+
+    def handle(self, *args, **options):
+        profiles = [
+            Profile('before', {}, persistent=False, begin='BEGIN'),
+            Profile('after', sqlite_pragmas(), persistent=True,
+                    begin='BEGIN IMMEDIATE'),
+        ]
+        for profile in profiles:
+            self.run(profile, options)
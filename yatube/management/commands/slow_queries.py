@@ -0,0 +1,72 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from yatube.slow_queries import fingerprint, log_path
+
+SORT_KEYS = {
+    'total': lambda shape: shape['total'],
+    'max': lambda shape: shape['max'],
+    'count': lambda shape: shape['count'],
+}
+
+
+class Command(BaseCommand):
+    help = ('Группирует журнал медленных запросов по отпечатку SQL и '
+            'выводит самые тяжёлые формы запросов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=None)
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument(
+            '--sort', choices=sorted(SORT_KEYS), default='total')
+
+    def entries(self, path):
+        for name in (f'{path}.1', path):
+            if not os.path.exists(name):
+                continue
+            with open(name, encoding='utf-8') as log:
+                for line in log:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+    def shapes(self, path):
+        shapes = {}
+        for entry in self.entries(path):
+            key = fingerprint(entry['sql'])
+            shape = shapes.setdefault(key, {
+                'fingerprint': key, 'count': 0, 'total': 0.0, 'max': 0.0,
+                'views': set(), 'frames': set(), 'plan': None,
+            })
+            shape['count'] += 1
+            shape['total'] += entry['duration_ms']
+            shape['max'] = max(shape['max'], entry['duration_ms'])
+            shape['views'].add(entry.get('view') or '-')
+            if entry.get('frame'):
+                shape['frames'].add(entry['frame'])
+            shape['plan'] = entry.get('plan') or shape['plan']
+        return shapes.values()
+
+    def handle(self, *args, **options):
+        path = options['file'] or log_path()
+        if not path:
+            raise CommandError(
+                'Укажите --file или настройку SLOW_QUERY_LOG.')
+        shapes = sorted(
+            self.shapes(path), key=SORT_KEYS[options['sort']], reverse=True)
+        for shape in shapes[:options['limit']]:
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{shape['total']:.1f} ms всего, {shape['count']} раз, "
+                f"среднее {shape['total'] / shape['count']:.1f} ms, "
+                f"максимум {shape['max']:.1f} ms"))
+            self.stdout.write(shape['fingerprint'])
+            self.stdout.write(
+                'Представления: ' + ', '.join(sorted(shape['views'])))
+            for frame in sorted(shape['frames']):
+                self.stdout.write(f'  {frame}')
+            if shape['plan']:
+                self.stdout.write(shape['plan'])
+            self.stdout.write('')
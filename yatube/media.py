@@ -0,0 +1,145 @@
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (FileResponse, Http404, HttpResponse,
+                         HttpResponseNotModified)
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+HASHED_NAME = re.compile(r'(^|[./_-])[0-9a-f]{32,}($|[./_-])')
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+class RangeFile:
+    """Файл, из которого читается не больше length байт."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def is_hashed(path):
+    return bool(HASHED_NAME.search(posixpath.basename(path)))
+
+
+def cache_control(path):
+    if is_hashed(path):
+        return IMMUTABLE
+    return f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+
+
+def parse_range(header, size):
+    """Диапазон (start, end) из заголовка Range, None или False.
+
+    None - заголовок не задан или не поддерживается (отдаём файл
+    целиком), False - диапазон не пересекается с файлом.
+    """
+    match = RANGE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def if_range_matches(request, mtime):
+    header = request.META.get('HTTP_IF_RANGE')
+    if header is None:
+        return True
+    header_mtime = parse_http_date_safe(header)
+    return header_mtime is not None and int(mtime) <= header_mtime
+
+
+def offload(path, fullpath):
+    mode = settings.MEDIA_OFFLOAD
+    if mode == 'x-accel-redirect':
+        return 'X-Accel-Redirect', settings.MEDIA_OFFLOAD_PREFIX + path
+    if mode == 'x-sendfile':
+        return 'X-Sendfile', fullpath
+    return None
+
+
+@require_safe
+def serve(request, path):
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    try:
+        stat = os.stat(fullpath)
+    except OSError:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+    headers = {
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': cache_control(path),
+        'Accept-Ranges': 'bytes',
+    }
+    if not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'),
+            stat.st_mtime, stat.st_size):
+        response = HttpResponseNotModified()
+        for name, value in headers.items():
+            response[name] = value
+        return response
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    content_type = content_type or 'application/octet-stream'
+
+    redirect = offload(path, fullpath)
+    if redirect is not None:
+        response = HttpResponse(content_type=content_type)
+        response[redirect[0]] = redirect[1]
+    else:
+        byte_range = None
+        if if_range_matches(request, stat.st_mtime):
+            byte_range = parse_range(
+                request.META.get('HTTP_RANGE'), stat.st_size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+        if byte_range is None:
+            response = FileResponse(
+                open(fullpath, 'rb'), content_type=content_type)
+        else:
+            start, end = byte_range
+            length = end - start + 1
+            response = FileResponse(
+                RangeFile(open(fullpath, 'rb'), start, length),
+                status=206, content_type=content_type)
+            response['Content-Range'] = (
+                f'bytes {start}-{end}/{stat.st_size}')
+            response['Content-Length'] = length
+    if encoding:
+        response['Content-Encoding'] = encoding
+    for name, value in headers.items():
+        response[name] = value
+    return response
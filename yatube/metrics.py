@@ -0,0 +1,253 @@
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.views.decorators.http import require_safe
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (
+    1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def metrics_dir():
+    return getattr(settings, 'METRICS_DIR', None)
+
+
+def flush_interval():
+    return getattr(settings, 'METRICS_FLUSH_INTERVAL', 10)
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\')
+                         .replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def merge(self, first, second):
+        return first + second
+
+    def samples(self, labels, value):
+        yield self.name, format_labels(self.labelnames, labels), value
+
+
+class Histogram(Counter):
+    """Гистограмма с фиксированными корзинами.
+
+    Значение метки хранится как список: число наблюдений в каждой
+    корзине (последняя — +Inf) и сумма наблюдений.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=(),
+                 registry=None):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value, *labels):
+        index = len(self.buckets)
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = position
+                break
+        with self.lock:
+            data = self.values.get(labels)
+            if data is None:
+                data = self.values[labels] = [0] * (len(self.buckets) + 2)
+            data[index] += 1
+            data[-1] += value
+
+    def merge(self, first, second):
+        return [a + b for a, b in zip(first, second)]
+
+    def samples(self, labels, value):
+        cumulative = 0
+        names = self.labelnames + ('le',)
+        bounds = [format_value(float(b)) for b in self.buckets] + ['+Inf']
+        for bound, count in zip(bounds, value):
+            cumulative += count
+            yield (f'{self.name}_bucket',
+                   format_labels(names, labels + (bound,)), cumulative)
+        plain = format_labels(self.labelnames, labels)
+        yield f'{self.name}_sum', plain, value[-1]
+        yield f'{self.name}_count', plain, cumulative
+
+
+class Registry:
+    """Метрики процесса и их объединение между воркерами.
+
+    Каждый процесс не чаще раза в METRICS_FLUSH_INTERVAL секунд пишет
+    снимок своих значений в METRICS_DIR/<pid>.json; при экспорте
+    снимки живых процессов суммируются, файлы завершившихся удаляются.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.flushed = time.monotonic()
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+
+    def snapshot(self):
+        data = {}
+        for name, metric in self.metrics.items():
+            with metric.lock:
+                data[name] = [
+                    [list(labels), value]
+                    for labels, value in metric.values.items()]
+        return data
+
+    def flush(self):
+        directory = metrics_dir()
+        self.flushed = time.monotonic()
+        data = self.snapshot()
+        if not directory or not any(data.values()):
+            return
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as snapshot:
+            json.dump(data, snapshot)
+        os.replace(temporary, path)
+
+    def maybe_flush(self):
+        if time.monotonic() - self.flushed >= flush_interval():
+            self.flush()
+
+    def snapshots(self):
+        directory = metrics_dir()
+        if not directory:
+            yield self.snapshot()
+            return
+        self.flush()
+        for path in glob.glob(os.path.join(directory, '*.json')):
+            pid = os.path.basename(path).split('.')[0]
+            if not pid.isdigit():
+                continue
+            if not process_alive(int(pid)):
+                os.remove(path)
+                continue
+            try:
+                with open(path) as snapshot:
+                    yield json.load(snapshot)
+            except (OSError, ValueError):
+                continue
+
+    def collect(self):
+        merged = {name: {} for name in self.metrics}
+        for snapshot in self.snapshots():
+            for name, entries in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                values = merged[name]
+                for labels, value in entries:
+                    labels = tuple(labels)
+                    values[labels] = (
+                        metric.merge(values[labels], value)
+                        if labels in values else value)
+        return merged
+
+    def render(self):
+        lines = []
+        for name, values in self.collect().items():
+            metric = self.metrics[name]
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for labels in sorted(values):
+                for sample, text, value in metric.samples(
+                        labels, values[labels]):
+                    lines.append(f'{sample}{text} {format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def process_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+REGISTRY = Registry()
+atexit.register(REGISTRY.flush)
+
+REQUEST_DURATION = Histogram(
+    'yatube_request_duration_seconds', 'Время обработки запроса.',
+    ('view',), LATENCY_BUCKETS)
+REQUEST_DB_DURATION = Histogram(
+    'yatube_request_db_seconds', 'Время SQL-запросов за запрос.',
+    ('view',), LATENCY_BUCKETS)
+RESPONSE_SIZE = Histogram(
+    'yatube_response_size_bytes', 'Размер тела ответа.',
+    ('view',), SIZE_BUCKETS)
+FRAGMENT_CACHE = Counter(
+    'yatube_fragment_cache_total', 'Обращения к кэшу фрагментов шаблонов.',
+    ('result',))
+THUMBNAIL_DURATION = Histogram(
+    'yatube_thumbnail_seconds', 'Время генерации миниатюр одного файла.',
+    (), LATENCY_BUCKETS)
+
+
+def observe_request(view, timings, response):
+    REQUEST_DURATION.observe(timings.total, view)
+    REQUEST_DB_DURATION.observe(timings.db_time, view)
+    if not response.streaming:
+        RESPONSE_SIZE.observe(len(response.content), view)
+    REGISTRY.maybe_flush()
+
+
+def allowed(request):
+    """Метрики видят staff и адреса из METRICS_ALLOWED_IPS.
+
+    За обратным прокси на той же машине REMOTE_ADDR у всех запросов
+    локальный, поэтому список пуст по умолчанию и не совпадает
+    с INTERNAL_IPS.
+    """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_staff:
+        return True
+    return request.META.get('REMOTE_ADDR') in getattr(
+        settings, 'METRICS_ALLOWED_IPS', ())
+
+
+@require_safe
+def metrics_view(request):
+    if not allowed(request):
+        raise PermissionDenied
+    return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,89 @@
+import random
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_APPS = ('posts.', 'api.')
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_state = threading.local()
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def pin_cookie():
+    return getattr(settings, 'REPLICA_PIN_COOKIE', 'use_primary')
+
+
+def pin_seconds():
+    return getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+
+
+def reset(use_replicas=False):
+    _state.use_replicas = use_replicas
+    _state.wrote = False
+
+
+def wrote():
+    return getattr(_state, 'wrote', False)
+
+
+class ReplicaRouter:
+    """Чтение в представлениях posts и api идёт с реплик, запись - в основную.
+
+    Реплики включает ReplicaMiddleware только на время безопасного
+    запроса; в командах, фоновых задачах и внутри транзакций всё читается
+    из основной базы.
+    """
+
+    def db_for_read(self, model, **hints):
+        aliases = replicas()
+        if (not aliases or not getattr(_state, 'use_replicas', False)
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        _state.use_replicas = False
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in replicas()
+
+
+class ReplicaMiddleware:
+    """Закрепляет пользователя за основной базой после записи.
+
+    После запроса, который что-то записал, ставится cookie на
+    REPLICA_PIN_SECONDS секунд: пока она жива, чтение идёт из основной
+    базы, и автор сразу видит свою запись, даже если реплика отстаёт.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reset()
+        try:
+            response = self.get_response(request)
+            if wrote():
+                response.set_cookie(
+                    pin_cookie(), '1', max_age=pin_seconds(),
+                    httponly=True, samesite='Lax')
+            return response
+        finally:
+            reset()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        module = getattr(view_func, '__module__', '')
+        reset(
+            request.method in SAFE_METHODS
+            and module.startswith(REPLICA_APPS)
+            and pin_cookie() not in request.COOKIES)
@@ -14,6 +14,8 @@ INSTALLED_APPS = [
     'users',
     'posts',
     'api',
+    'tasks',
+    'yatube',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -28,7 +30,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'yatube.routers.ReplicaMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'yatube.timing.ServerTimingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -48,7 +52,7 @@ TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'yatube.template_backends.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -65,13 +69,43 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+TEST_RUNNER = 'yatube.test_runner.TestRunner'
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'yatube.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 268435456,
+    'cache_size': -20000,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+DATABASE_REPLICAS = []
+
+for number, name in enumerate(
+        filter(None, os.environ.get('YATUBE_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'yatube.sqlite3',
+        'NAME': name,
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['yatube.routers.ReplicaRouter']
+
+REPLICA_PIN_SECONDS = 5
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -101,24 +135,98 @@ STATIC_URL = '/static/'
 
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 
+STATICFILES_STORAGE = 'yatube.storage.StaticStorage'
+
+WHITENOISE_MAX_AGE = 3600
+
 MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+MEDIA_CACHE_MAX_AGE = 3600
+
+MEDIA_OFFLOAD = None
+
+MEDIA_OFFLOAD_PREFIX = '/protected-media/'
+
 LOGIN_URL = '/auth/login/'
 
 LOGIN_REDIRECT_URL = 'index'
 
 LOGOUT_REDIRECT_URL = 'index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BACKEND = 'tasks.mail.QueuedEmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+PAGINATION_MODE = 'cursor'
+
+PAGE_CACHE_TIMEOUT = 300
+
+TIMELINE_FANOUT_LIMIT = 1000
+
+TIMELINE_SYNC_FANOUT_LIMIT = 100
+
+TIMELINE_BACKFILL_LIMIT = 1000
+
+SEARCH_MAX_RESULTS = 1000
+
+TASKS_EAGER = False
+
+TASKS_VISIBILITY_TIMEOUT = 300
+
+TASKS_RETRY_DELAY = 10
+
+TASKS_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+
+METRICS_DIR = os.environ.get('YATUBE_METRICS_DIR')
+
+METRICS_ALLOWED_IPS = []
+
+METRICS_FLUSH_INTERVAL = 10
+
+TIMING_LOG = True
+
+SLOW_QUERY_LOG = os.environ.get('YATUBE_SLOW_QUERY_LOG')
+
+SLOW_QUERY_THRESHOLD = 0.1
+
+SLOW_QUERY_SAMPLE_RATE = 1.0
+
+SLOW_QUERY_MAX_PER_SECOND = 10
+
+SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+
+IMAGE_MAX_PIXELS = 16000000
+IMAGE_MAX_SIDE = 2048
+IMAGE_QUALITY = 85
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'BACKEND': 'yatube.cache_backends.TieredCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {
+            'L1_MAX_ENTRIES': 1000,
+            'L1_TIMEOUT': 5,
+            'EPOCH_INTERVAL': 1,
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    'versions': {
+        'BACKEND': 'yatube.cache_backends.CounterFileCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'versions'),
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000000,
+        },
+    },
 }
 
 REST_FRAMEWORK = {
@@ -133,7 +241,40 @@ REST_FRAMEWORK = {
     ],
 }
 
+API_PAGE_SIZE = 20
+
+API_STREAM_CHUNK_SIZE = 500
+
+API_BULK_MAX_ITEMS = 500
+
+API_SYNC_LIMIT = 500
+
+API_SYNC_RETENTION = 30 * 24 * 60 * 60
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=10),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=10),
 }
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'require_timing_log': {
+            '()': 'yatube.timing.RequireTimingLog',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'filters': ['require_timing_log'],
+        },
+    },
+    'loggers': {
+        'yatube.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,167 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from .timing import current_view
+
+MAX_PARAMS = 20
+MAX_PARAM_LENGTH = 200
+EXPLAIN_CACHE_SIZE = 500
+SKIPPED_FRAMES = (
+    'yatube/slow_queries.py', 'yatube/timing.py',
+    'yatube/template_backends.py', 'yatube/sqlite3/',
+)
+
+_local = threading.local()
+
+FINGERPRINT_RULES = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(?+)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def log_path():
+    return getattr(settings, 'SLOW_QUERY_LOG', None)
+
+
+def fingerprint(sql):
+    for pattern, replacement in FINGERPRINT_RULES:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def origin():
+    base = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()):
+        if (not frame.filename.startswith(base)
+                or 'site-packages' in frame.filename):
+            continue
+        path = os.path.relpath(frame.filename, base)
+        if not path.startswith(SKIPPED_FRAMES):
+            return f'{path}:{frame.lineno} in {frame.name}'
+    return None
+
+
+def explain(connection, sql, params):
+    prefix = connection.ops.explain_query_prefix()
+    _local.explaining = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}', params)
+            rows = cursor.fetchall()
+    except (DatabaseError, NotImplementedError) as error:
+        return f'EXPLAIN недоступен: {error}'
+    finally:
+        _local.explaining = False
+    if connection.vendor == 'sqlite':
+        return '\n'.join(row[-1] for row in rows)
+    return '\n'.join(' '.join(map(str, row)) for row in rows)
+
+
+class SlowQueryLog:
+    """Обёртка execute, записывающая медленные запросы в SLOW_QUERY_LOG.
+
+    Запрос дольше SLOW_QUERY_THRESHOLD секунд попадает в журнал с
+    вероятностью SLOW_QUERY_SAMPLE_RATE и не чаще SLOW_QUERY_MAX_PER_SECOND
+    раз в секунду на процесс. План EXPLAIN строится один раз на
+    отпечаток запроса; при превышении SLOW_QUERY_LOG_MAX_BYTES журнал
+    переносится в файл с суффиксом .1.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.plans = {}
+        self.window = 0
+        self.written = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_local, 'explaining', False):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            if duration >= getattr(settings, 'SLOW_QUERY_THRESHOLD', 0.1):
+                self.record(context['connection'], sql, params, many,
+                            duration)
+
+    def admit(self):
+        if random.random() >= getattr(
+                settings, 'SLOW_QUERY_SAMPLE_RATE', 1.0):
+            return False
+        second = int(time.monotonic())
+        with self.lock:
+            if second != self.window:
+                self.window = second
+                self.written = 0
+            if self.written >= getattr(
+                    settings, 'SLOW_QUERY_MAX_PER_SECOND', 10):
+                return False
+            self.written += 1
+        return True
+
+    def plan(self, connection, sql, params, many):
+        statement = sql.lstrip()[:6].upper()
+        if many or not statement.startswith(('SELECT', 'WITH')):
+            return None
+        key = fingerprint(sql)
+        plan = self.plans.get(key)
+        if plan is None:
+            if len(self.plans) >= EXPLAIN_CACHE_SIZE:
+                self.plans.clear()
+            plan = self.plans[key] = explain(connection, sql, params)
+        return plan
+
+    def record(self, connection, sql, params, many, duration):
+        path = log_path()
+        if not path or not self.admit():
+            return
+        if many:
+            params = list(params or [])[:1]
+        entry = {
+            'time': time.time(),
+            'duration_ms': round(duration * 1000, 2),
+            'alias': connection.alias,
+            'sql': sql,
+            'params': [
+                repr(param)[:MAX_PARAM_LENGTH]
+                for param in list(params or [])[:MAX_PARAMS]],
+            'many': many,
+            'view': current_view(),
+            'frame': origin(),
+            'plan': self.plan(connection, sql, params, many),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        self.write(path, line.encode('utf-8'))
+
+    def write(self, path, line):
+        limit = getattr(settings, 'SLOW_QUERY_LOG_MAX_BYTES', 10485760)
+        with self.lock:
+            try:
+                if os.path.getsize(path) + len(line) > limit:
+                    os.replace(path, f'{path}.1')
+            except FileNotFoundError:
+                pass
+            with open(path, 'ab') as log:
+                log.write(line)
+
+
+SLOW_QUERIES = SlowQueryLog()
+
+
+def install(sender, connection, **kwargs):
+    # Обёртка ставится первой: execute_wrapper() снимает свои обёртки
+    # с конца списка.
+    if log_path() and SLOW_QUERIES not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, SLOW_QUERIES)
@@ -0,0 +1,14 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite-бэкенд, который открывает транзакции через BEGIN IMMEDIATE.
+
+    При обычном BEGIN транзакция, которая сначала читает, а потом пишет,
+    в режиме WAL получает "database is locked" сразу, без ожидания
+    busy_timeout. IMMEDIATE берёт блокировку записи в начале транзакции,
+    и конкурирующие запросы ждут своей очереди.
+    """
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -0,0 +1,23 @@
+import logging
+
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+logger = logging.getLogger(__name__)
+
+
+class StaticStorage(CompressedManifestStaticFilesStorage):
+    """Хэшированные имена плюс .gz и .br рядом с каждым файлом.
+
+    Файл, которого нет в манифесте, отдаётся по исходному имени, а не
+    роняет рендеринг страницы; такие ссылки ловит проверка
+    yatube.E001 (manage.py check --deploy).
+    """
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            logger.warning('Статический файл %s не найден в манифесте', name)
+            return name
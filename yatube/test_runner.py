@@ -0,0 +1,15 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """Запуск тестов без строк yatube.timing в консоли."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.quiet = override_settings(TIMING_LOG=False)
+        self.quiet.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.quiet.disable()
+        super().teardown_test_environment(**kwargs)
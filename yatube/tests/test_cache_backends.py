@@ -0,0 +1,92 @@
+import shutil
+import tempfile
+import threading
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from yatube.cache_backends import CounterFileCache, TieredCache
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tiered-tests',
+    },
+}
+OPTIONS = {
+    'L1_MAX_ENTRIES': 2,
+    'L1_TIMEOUT': 60,
+    'EPOCH_INTERVAL': 0,
+    'L1_BYPASS_PREFIXES': ['version:'],
+}
+
+
+@override_settings(CACHES=CACHES)
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches['shared'].clear()
+        self.worker = TieredCache('shared', {'OPTIONS': OPTIONS})
+        self.another_worker = TieredCache('shared', {'OPTIONS': OPTIONS})
+
+    def test_l1_serves_local_copy(self):
+        """Проверка чтения из кэша процесса."""
+        self.worker.set('key', 'value')
+        caches['shared'].set('key', 'changed')
+        self.assertEqual(
+            self.worker.get('key'), 'value',
+            'Значение должно читаться из L1.')
+        self.assertEqual(
+            self.another_worker.get('key'), 'changed',
+            'Другой процесс должен читать значение из L2.')
+
+    def test_l1_is_bounded(self):
+        """Проверка ограничения размера L1."""
+        self.worker.set_many({'first': 1, 'second': 2, 'third': 3})
+        caches['shared'].set('first', 'changed')
+        self.assertEqual(
+            self.worker.get_many(['first', 'second', 'third']),
+            {'first': 'changed', 'second': 2, 'third': 3},
+            'Самая старая запись должна вытесняться из L1.')
+
+    def test_version_keys_bypass_l1(self):
+        """Проверка чтения счётчиков версий из L2."""
+        self.worker.set('version:posts', 1)
+        self.another_worker.incr('version:posts')
+        self.assertEqual(
+            self.worker.get('version:posts'), 2,
+            'Счётчики версий не должны кэшироваться в L1.')
+
+    def test_delete_is_broadcast(self):
+        """Проверка распространения удаления на другие процессы."""
+        self.worker.set('key', 'value')
+        self.another_worker.get('key')
+        self.worker.delete('key')
+        caches['shared'].set('key', 'changed')
+        self.assertEqual(
+            self.another_worker.get('key'), 'changed',
+            'Удаление должно сбрасывать L1 других процессов.')
+
+
+class CounterFileCacheTests(SimpleTestCase):
+    def test_concurrent_incr_not_lost(self):
+        """Проверка, что одновременные incr не теряются."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        CounterFileCache(directory, {}).set('version:posts', 0, None)
+
+        def bump():
+            counter = CounterFileCache(directory, {})
+            for _ in range(50):
+                counter.incr('version:posts')
+
+        threads = [threading.Thread(target=bump) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(
+            CounterFileCache(directory, {}).get('version:posts'), 200,
+            'Увеличения счётчика из разных процессов не должны теряться.')
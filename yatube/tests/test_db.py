@@ -0,0 +1,53 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase
+
+from yatube.db import check_connections
+
+PRAGMAS = {
+    'synchronous': 1,
+    'cache_size': -20000,
+    'busy_timeout': 5000,
+    'temp_store': 2,
+}
+
+
+class SqliteProfileTests(SimpleTestCase):
+    databases = {'default'}
+
+    def test_pragmas_applied(self):
+        """Проверка настроек SQLite при открытии соединения."""
+        with connection.cursor() as cursor:
+            for name, expected in PRAGMAS.items():
+                with self.subTest(pragma=name):
+                    cursor.execute(f'PRAGMA {name}')
+                    self.assertEqual(
+                        cursor.fetchone()[0], expected,
+                        f'Проверьте PRAGMA {name}.')
+
+    def test_unusable_connection_closed(self):
+        """Проверка закрытия неработающего постоянного соединения."""
+        connection.ensure_connection()
+        settings_dict = dict(connection.settings_dict, CONN_HEALTH_CHECKS=True)
+        patches = (
+            mock.patch.object(connection, 'settings_dict', settings_dict),
+            mock.patch.object(connection, 'is_usable', return_value=False),
+        )
+        with patches[0], patches[1], \
+                mock.patch.object(connection, 'close') as close:
+            check_connections()
+        close.assert_called_once_with()
+
+    def test_bench_sqlite(self):
+        """Проверка команды bench_sqlite."""
+        out = StringIO()
+        call_command(
+            'bench_sqlite', seconds=0.2, rows=100, writers=2, readers=2,
+            stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(
+            [line.split()[0] for line in lines], ['before', 'after'],
+            'Команда должна сравнивать два профиля.')
@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+from django.utils.http import http_date
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+HASHED_NAME = 'posts/' + 'a' * 64 + '.jpg'
+PLAIN_NAME = 'posts/small.gif'
+CONTENT = b'0123456789'
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_OFFLOAD=None)
+class MediaServeTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(MEDIA_ROOT, 'posts'), exist_ok=True)
+        for name in (HASHED_NAME, PLAIN_NAME):
+            with open(os.path.join(MEDIA_ROOT, name), 'wb') as file:
+                file.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def get(self, name, **headers):
+        response = self.client.get(f'/media/{name}', **headers)
+        body = b''.join(response.streaming_content) if (
+            response.streaming) else response.content
+        return response, body
+
+    def test_full_file(self):
+        """Проверка отдачи файла целиком."""
+        response, body = self.get(PLAIN_NAME)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, CONTENT, 'Проверьте содержимое файла.')
+        self.assertEqual(response['Content-Type'], 'image/gif')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertNotIn(
+            'immutable', response['Cache-Control'],
+            'Обычные имена не должны кэшироваться навсегда.')
+
+    def test_hashed_name_immutable(self):
+        """Проверка вечного кэширования файлов с хэшем в имени."""
+        response, body = self.get(HASHED_NAME)
+        self.assertIn(
+            'immutable', response['Cache-Control'],
+            'Файлы с хэшем в имени должны кэшироваться навсегда.')
+
+    def test_ranges(self):
+        """Проверка ответов на заголовок Range."""
+        ranges = {
+            'bytes=2-4': (206, b'234', 'bytes 2-4/10'),
+            'bytes=7-': (206, b'789', 'bytes 7-9/10'),
+            'bytes=-2': (206, b'89', 'bytes 8-9/10'),
+            'bytes=5-100': (206, b'56789', 'bytes 5-9/10'),
+            'bytes=20-30': (416, b'', 'bytes */10'),
+        }
+        for header, (status, content, content_range) in ranges.items():
+            with self.subTest(header=header):
+                response, body = self.get(PLAIN_NAME, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, status)
+                self.assertEqual(body, content)
+                self.assertEqual(response['Content-Range'], content_range)
+
+    def test_if_modified_since(self):
+        """Проверка ответа 304 на If-Modified-Since."""
+        mtime = os.stat(os.path.join(MEDIA_ROOT, PLAIN_NAME)).st_mtime
+        response, body = self.get(
+            PLAIN_NAME, HTTP_IF_MODIFIED_SINCE=http_date(mtime + 1))
+        self.assertEqual(
+            response.status_code, 304,
+            'Неизменённый файл должен отдаваться с кодом 304.')
+
+    def test_missing_and_outside_files(self):
+        """Проверка 404 для отсутствующих файлов и выхода из MEDIA_ROOT."""
+        for name in ('posts/missing.jpg', '../settings.py', 'posts'):
+            with self.subTest(name=name):
+                response, body = self.get(name)
+                self.assertEqual(response.status_code, 404)
+
+    @override_settings(
+        MEDIA_OFFLOAD='x-accel-redirect',
+        MEDIA_OFFLOAD_PREFIX='/protected-media/')
+    def test_accel_redirect(self):
+        """Проверка передачи отдачи файла фронтенд-серверу."""
+        response, body = self.get(PLAIN_NAME)
+        self.assertEqual(
+            response['X-Accel-Redirect'], f'/protected-media/{PLAIN_NAME}')
+        self.assertEqual(body, b'', 'Тело ответа должен отдавать прокси.')
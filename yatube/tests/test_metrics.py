@@ -0,0 +1,108 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from yatube import metrics
+
+INDEX_URL = reverse('index')
+METRICS_URL = reverse('metrics')
+DEAD_PID = 4194305
+
+
+class RegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.registry = metrics.Registry()
+        self.histogram = metrics.Histogram(
+            'test_seconds', 'Тест.', ('view',), (0.1, 1),
+            registry=self.registry)
+        self.counter = metrics.Counter(
+            'test_total', 'Тест.', registry=self.registry)
+
+    def write(self, pid, data):
+        with open(os.path.join(self.directory, f'{pid}.json'), 'w') as file:
+            json.dump(data, file)
+
+    def test_histogram_text_format(self):
+        """Проверка вывода гистограммы в формате Prometheus."""
+        for value in (0.05, 0.5, 5):
+            self.histogram.observe(value, 'index')
+        with override_settings(METRICS_DIR=None):
+            text = self.registry.render()
+        for line in (
+                '# TYPE test_seconds histogram',
+                'test_seconds_bucket{view="index",le="0.1"} 1',
+                'test_seconds_bucket{view="index",le="1.0"} 2',
+                'test_seconds_bucket{view="index",le="+Inf"} 3',
+                'test_seconds_sum{view="index"} 5.55',
+                'test_seconds_count{view="index"} 3'):
+            with self.subTest(line=line):
+                self.assertIn(line, text, 'Проверьте вывод гистограммы.')
+
+    def test_workers_aggregated(self):
+        """Проверка суммирования снимков живых воркеров."""
+        self.counter.inc(amount=2)
+        self.write(os.getppid(), {'test_total': [[[], 3]]})
+        self.write(DEAD_PID, {'test_total': [[[], 100]]})
+        with override_settings(METRICS_DIR=self.directory):
+            text = self.registry.render()
+        self.assertIn(
+            'test_total 5', text, 'Счётчики воркеров должны суммироваться.')
+        self.assertFalse(
+            os.path.exists(os.path.join(self.directory, f'{DEAD_PID}.json')),
+            'Снимок завершившегося процесса должен удаляться.')
+
+
+@override_settings(METRICS_DIR=None)
+class MetricsEndpointTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create(username='Staff', is_staff=True)
+        cls.user = User.objects.create(username='Regular')
+        Post.objects.create(text='Тестовый текст', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_endpoint_restricted(self):
+        """Проверка доступа к метрикам для staff и METRICS_ALLOWED_IPS."""
+        self.client.force_login(self.user)
+        for address in ('10.0.0.1', '127.0.0.1'):
+            with self.subTest(address=address):
+                response = self.client.get(METRICS_URL, REMOTE_ADDR=address)
+                self.assertEqual(
+                    response.status_code, 403,
+                    'Метрики не должны быть доступны обычным пользователям.')
+        with override_settings(METRICS_ALLOWED_IPS=['10.0.0.1']):
+            response = self.client.get(METRICS_URL, REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(
+            response.status_code, 200,
+            'Метрики должны быть доступны с METRICS_ALLOWED_IPS.')
+
+    def test_request_metrics_exported(self):
+        """Проверка метрик запросов и кэша фрагментов."""
+        self.client.force_login(self.user)
+        hits = metrics.FRAGMENT_CACHE.values.get(('hit',), 0)
+        self.client.get(INDEX_URL)
+        self.client.get(INDEX_URL)
+        self.assertEqual(
+            metrics.FRAGMENT_CACHE.values.get(('hit',), 0), hits + 1,
+            'Повторный запрос должен попадать в кэш фрагментов.')
+        self.client.force_login(self.staff)
+        response = self.client.get(METRICS_URL, REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        text = response.content.decode()
+        for sample in (
+                'yatube_request_duration_seconds_count{view="index"}',
+                'yatube_request_db_seconds_count{view="index"}',
+                'yatube_response_size_bytes_count{view="index"}',
+                'yatube_fragment_cache_total{result="hit"}'):
+            with self.subTest(sample=sample):
+                self.assertIn(sample, text, 'Проверьте экспорт метрик.')
@@ -0,0 +1,68 @@
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from posts import views
+from posts.models import Post
+from yatube import routers
+
+REPLICAS = ['replica1']
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS, REPLICA_PIN_SECONDS=5)
+class ReplicaRoutingTests(SimpleTestCase):
+    databases = {'default'}
+
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+        self.factory = RequestFactory()
+        self.addCleanup(routers.reset)
+
+    def handle(self, request, view=views.index, write=False):
+        seen = {}
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            seen['before'] = self.router.db_for_read(Post)
+            if write:
+                self.router.db_for_write(Post)
+                seen['after'] = self.router.db_for_read(Post)
+            return HttpResponse()
+
+        middleware = routers.ReplicaMiddleware(get_response)
+        return middleware(request), seen
+
+    def test_safe_feed_requests_read_from_replica(self):
+        """Проверка чтения лент с реплики."""
+        response, seen = self.handle(self.factory.get('/'))
+        self.assertEqual(
+            seen['before'], 'replica1',
+            'Чтение в представлениях posts должно идти с реплики.')
+        self.assertEqual(
+            self.router.db_for_read(Post), 'default',
+            'Вне запроса чтение должно идти из основной базы.')
+
+    def test_write_pins_to_primary(self):
+        """Проверка закрепления за основной базой после записи."""
+        response, seen = self.handle(
+            self.factory.post('/new/'), view=views.new_post, write=True)
+        self.assertEqual(
+            seen['after'], 'default',
+            'После записи чтение должно идти из основной базы.')
+        cookie = response.cookies[routers.pin_cookie()]
+        self.assertEqual(cookie['max-age'], 5)
+        request = self.factory.get('/')
+        request.COOKIES[routers.pin_cookie()] = '1'
+        response, seen = self.handle(request)
+        self.assertEqual(
+            seen['before'], 'default',
+            'С cookie закрепления чтение должно идти из основной базы.')
+
+    def test_other_views_and_transactions_use_primary(self):
+        """Проверка основной базы вне posts/api и внутри транзакций."""
+        response, seen = self.handle(
+            self.factory.get('/about/'), view=HttpResponse)
+        self.assertEqual(seen['before'], 'default')
+        routers.reset(True)
+        with transaction.atomic():
+            self.assertEqual(self.router.db_for_read(Post), 'default')
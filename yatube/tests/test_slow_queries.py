@@ -0,0 +1,108 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from yatube import slow_queries
+
+INDEX_URL = reverse('index')
+
+
+class FingerprintTests(SimpleTestCase):
+    def test_literals_normalized(self):
+        """Проверка нормализации SQL в отпечатке."""
+        first = slow_queries.fingerprint(
+            "SELECT * FROM t WHERE id IN (1, 2, 3) AND s = 'a'  LIMIT 11")
+        second = slow_queries.fingerprint(
+            'SELECT * FROM t WHERE id IN (%s, %s) AND s = %s LIMIT 21')
+        self.assertEqual(
+            first, second, 'Отпечатки одной формы запроса должны совпадать.')
+        self.assertEqual(
+            first, 'SELECT * FROM t WHERE id IN (?+) AND s = ? LIMIT ?')
+
+
+class SlowQueryLogTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='SlowAuthor')
+        Post.objects.create(text='Тестовый текст', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = os.path.join(directory, 'slow.log')
+
+    def request(self, **options):
+        options = dict(
+            SLOW_QUERY_LOG=self.path, SLOW_QUERY_THRESHOLD=0,
+            SLOW_QUERY_MAX_PER_SECOND=1000, **options)
+        with override_settings(**options), \
+                connection.execute_wrapper(slow_queries.SlowQueryLog()):
+            self.client.get(INDEX_URL)
+
+    def entries(self):
+        with open(self.path, encoding='utf-8') as log:
+            return [json.loads(line) for line in log]
+
+    def test_entry_contents(self):
+        """Проверка записи запроса, представления, кадра и плана."""
+        self.request()
+        entry = next(
+            entry for entry in self.entries()
+            if 'FROM "posts_post"' in entry['sql'])
+        self.assertEqual(
+            entry['view'], 'index', 'Проверьте имя представления.')
+        self.assertTrue(
+            entry['frame'].startswith('posts/'),
+            'Кадр стека должен указывать на код проекта.')
+        self.assertTrue(entry['plan'], 'Должен сохраняться план запроса.')
+
+    def test_sampling_and_size_cap(self):
+        """Проверка выборки и ограничения размера журнала."""
+        self.request(SLOW_QUERY_SAMPLE_RATE=0)
+        self.assertFalse(
+            os.path.exists(self.path),
+            'При нулевой доле выборки журнал не пишется.')
+        for _ in range(2):
+            cache.clear()
+            self.request(SLOW_QUERY_LOG_MAX_BYTES=2000)
+        self.assertTrue(
+            os.path.exists(f'{self.path}.1'),
+            'Переполненный журнал должен переноситься в .1.')
+        self.assertLessEqual(os.path.getsize(self.path), 2000)
+
+    def test_summary_command(self):
+        """Проверка команды slow_queries."""
+        self.request()
+        out = StringIO()
+        call_command('slow_queries', file=self.path, limit=3, stdout=out)
+        self.assertIn(
+            'Представления: index', out.getvalue(),
+            'Сводка должна группировать запросы по отпечатку.')
+
+    def uninstall(self):
+        if slow_queries.SLOW_QUERIES in connection.execute_wrappers:
+            connection.execute_wrappers.remove(slow_queries.SLOW_QUERIES)
+
+    def test_install_keeps_wrapper_order(self):
+        """Проверка установки обёртки первой в списке."""
+        self.addCleanup(self.uninstall)
+        with override_settings(SLOW_QUERY_LOG=self.path), \
+                connection.execute_wrapper(lambda *args: args[0](*args[1:])):
+            slow_queries.install(None, connection)
+            slow_queries.install(None, connection)
+            self.assertEqual(
+                connection.execute_wrappers.count(slow_queries.SLOW_QUERIES),
+                1, 'Обёртка не должна устанавливаться дважды.')
+        self.assertEqual(
+            connection.execute_wrappers, [slow_queries.SLOW_QUERIES],
+            'execute_wrapper() должен снимать только свою обёртку.')
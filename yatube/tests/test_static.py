@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from yatube.checks import check_static_references
+
+ROOT = tempfile.mkdtemp()
+STATIC_DIR = os.path.join(ROOT, 'assets')
+STATIC_ROOT = os.path.join(ROOT, 'static')
+TEMPLATE_DIR = os.path.join(ROOT, 'templates')
+
+CSS_NAME = 'css/site.css'
+CSS = 'body { color: #333; }\n' * 100
+TEMPLATE = (
+    '{% load static %}\n'
+    '<link rel="stylesheet" href="{% static \'css/site.css\' %}">\n'
+    '<script src="{% static "js/missing.js" %}"></script>\n'
+)
+
+
+@override_settings(
+    STATIC_ROOT=STATIC_ROOT,
+    STATICFILES_DIRS=[STATIC_DIR],
+    STATICFILES_FINDERS=[
+        'django.contrib.staticfiles.finders.FileSystemFinder'],
+    STATICFILES_STORAGE='yatube.storage.StaticStorage',
+    TEMPLATES=[dict(settings.TEMPLATES[0], DIRS=[TEMPLATE_DIR])],
+)
+class StaticPipelineTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(STATIC_DIR, 'css'))
+        os.makedirs(TEMPLATE_DIR)
+        with open(os.path.join(STATIC_DIR, CSS_NAME), 'w') as file:
+            file.write(CSS)
+        with open(os.path.join(TEMPLATE_DIR, 'page.html'), 'w') as file:
+            file.write(TEMPLATE)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def template_errors(self):
+        return [error for error in check_static_references(None)
+                if error.id == 'yatube.E002'
+                or str(error.obj).startswith(TEMPLATE_DIR)]
+
+    def test_collectstatic_writes_hashed_and_compressed_files(self):
+        """Проверка хэшированных имён и сжатых копий после collectstatic."""
+        self.assertEqual(
+            [error.id for error in self.template_errors()], ['yatube.E002'],
+            'Без манифеста проверка должна сообщать о collectstatic.')
+        call_command('collectstatic', interactive=False, stdout=StringIO())
+        hashed = staticfiles_storage.stored_name(CSS_NAME)
+        self.assertRegex(
+            hashed, r'^css/site\.[0-9a-f]{12}\.css$',
+            'Имя статического файла должно содержать хэш.')
+        for suffix in ('', '.gz', '.br'):
+            with self.subTest(suffix=suffix):
+                self.assertTrue(
+                    os.path.exists(
+                        os.path.join(STATIC_ROOT, hashed + suffix)),
+                    f'Проверьте файл {hashed}{suffix}.')
+        errors = self.template_errors()
+        self.assertEqual(
+            [(error.id, error.obj) for error in errors],
+            [('yatube.E001', os.path.join(TEMPLATE_DIR, 'page.html'))],
+            'Проверка должна находить ссылки на отсутствующие файлы.')
+        self.assertIn('js/missing.js', errors[0].msg)
+        self.assertEqual(
+            staticfiles_storage.stored_name('js/missing.js'),
+            'js/missing.js',
+            'Отсутствующий файл не должен ронять рендеринг.')
@@ -0,0 +1,75 @@
+import json
+import logging
+import re
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from yatube.timing import RequireTimingLog
+
+INDEX_URL = reverse('index')
+API_POSTS_URL = reverse('posts-list')
+
+
+def metrics(header):
+    return dict(
+        re.match(r'\s*([\w-]+)(.*)', part).groups()
+        for part in header.split(','))
+
+
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='TimingAuthor')
+        Post.objects.create(text='Тестовый текст', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_header_contains_view_and_sql(self):
+        """Проверка заголовка Server-Timing на странице index."""
+        response = self.client.get(INDEX_URL)
+        parts = metrics(response['Server-Timing'])
+        self.assertEqual(
+            set(parts), {'total', 'db', 'tpl', 'cache'},
+            'Проверьте набор метрик в Server-Timing.')
+        self.assertIn(
+            'desc="index"', parts['total'],
+            'В Server-Timing должно быть имя представления.')
+        queries = int(re.search(r'"(\d+) queries"', parts['db']).group(1))
+        self.assertGreater(queries, 0, 'Проверьте подсчёт SQL-запросов.')
+        self.assertNotIn(
+            'dur=0.0', parts['tpl'],
+            'Проверьте учёт времени рендеринга шаблонов.')
+
+    def test_cache_hits_counted(self):
+        """Проверка учёта попаданий в кэш."""
+        self.client.get(INDEX_URL)
+        response = self.client.get(INDEX_URL)
+        hits = re.search(r'hit=(\d+)', response['Server-Timing']).group(1)
+        self.assertGreater(
+            int(hits), 0, 'Повторный запрос должен попадать в кэш.')
+
+    def test_structured_log_line(self):
+        """Проверка строки лога для запроса к API."""
+        with self.assertLogs('yatube.timing', 'INFO') as logs:
+            self.client.get(API_POSTS_URL)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(
+            record['view'], 'posts-list',
+            'В логе должно быть имя маршрута API.')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['db_queries'], 0)
+        self.assertGreaterEqual(record['total_ms'], record['db_ms'])
+
+    def test_log_filter(self):
+        """Проверка отключения строк лога настройкой TIMING_LOG."""
+        record = logging.makeLogRecord({'msg': '{}'})
+        log_filter = RequireTimingLog()
+        self.assertFalse(
+            log_filter.filter(record),
+            'В тестах строки yatube.timing не должны выводиться.')
+        with override_settings(TIMING_LOG=True):
+            self.assertTrue(log_filter.filter(record))
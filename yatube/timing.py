@@ -0,0 +1,127 @@
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+
+logger = logging.getLogger('yatube.timing')
+
+_local = threading.local()
+
+
+class RequireTimingLog(logging.Filter):
+    """Пропускает строки yatube.timing, пока включена настройка TIMING_LOG."""
+
+    def filter(self, record):
+        return getattr(settings, 'TIMING_LOG', True)
+
+
+class RequestTimings:
+    """Счётчики одного запроса: SQL, кэш, шаблоны и общее время."""
+
+    __slots__ = (
+        'request', 'started', 'total', 'db_queries', 'db_time', 'cache_hits',
+        'cache_misses', 'template_time', 'rendering',
+    )
+
+    def __init__(self, request=None):
+        self.request = request
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_time = 0.0
+        self.rendering = False
+
+    def execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.db_queries += 1
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+    def header(self, view):
+        return (
+            f'total;dur={self.total * 1000:.1f};desc="{view}", '
+            f'db;dur={self.db_time * 1000:.1f};'
+            f'desc="{self.db_queries} queries", '
+            f'tpl;dur={self.template_time * 1000:.1f}, '
+            f'cache;desc="hit={self.cache_hits} miss={self.cache_misses}"'
+        )
+
+    def as_dict(self):
+        return {
+            'total_ms': round(self.total * 1000, 2),
+            'db_queries': self.db_queries,
+            'db_ms': round(self.db_time * 1000, 2),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'template_ms': round(self.template_time * 1000, 2),
+        }
+
+
+def current():
+    return getattr(_local, 'timings', None)
+
+
+def record_cache(hits, misses):
+    timings = current()
+    if timings is not None:
+        timings.cache_hits += hits
+        timings.cache_misses += misses
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else 'unresolved'
+
+
+def current_view():
+    timings = current()
+    if timings is None or timings.request is None:
+        return None
+    return view_name(timings.request)
+
+
+class ServerTimingMiddleware:
+    """Добавляет к ответу заголовок Server-Timing и пишет строку в лог.
+
+    Время SQL считается обёрткой execute_wrapper на всех соединениях,
+    попадания в кэш отмечает TieredCache, время шаблонов — бэкенд
+    yatube.template_backends.TimedDjangoTemplates.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings(request)
+        _local.timings = timings
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timings.execute))
+                response = self.get_response(request)
+        finally:
+            _local.timings = None
+        timings.finish()
+        view = view_name(request)
+        response['Server-Timing'] = timings.header(view)
+        metrics.observe_request(view, timings, response)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(dict(
+                view=view, method=request.method, path=request.path,
+                status=response.status_code, **timings.as_dict())))
+        return response
@@ -4,7 +4,9 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path, re_path
 from django.contrib.staticfiles.urls import staticfiles_urlpatterns
-from django.views.static import serve
+
+from .media import serve
+from .metrics import metrics_view
 
 handler404 = 'posts.views.page_not_found'  # noqa
 handler500 = 'posts.views.server_error'  # noqa
@@ -13,6 +15,7 @@ urlpatterns = [
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
     path('admin/', admin.site.urls),
+    path('metrics/', metrics_view, name='metrics'),
     path('', include('posts.urls')),
     path('about/', include('about.urls', namespace='about')),
     path('api/', include('api.urls')),
@@ -24,16 +27,11 @@ if settings.DEBUG:
     urlpatterns += static(
         settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-
     urlpatterns += (path(
         '__debug__/', include(debug_toolbar.urls)),
     )
 
 urlpatterns += staticfiles_urlpatterns()
 urlpatterns += [re_path(
-    r'^media/(?P<path>.*)$',
-    serve,
-    {'document_root': settings.MEDIA_ROOT, }),
+    r'^media/(?P<path>.*)$', serve, name='media'),
 ]